@@ -37,13 +37,22 @@ resource "aws_dynamodb_table" "videos" {
   }
 
   # Global Secondary Index for querying recent summaries
-  # gsi1pk: "SUMMARY"
+  # gsi1pk: "SUMMARY" (set on VIDEO#/METADATA once processed)
   # gsi1sk: ISO timestamp for range queries
+  # Projects only what the newsletter reads (table keys are always projected)
   global_secondary_index {
-    name            = "GSI1"
-    hash_key        = "gsi1pk"
-    range_key       = "gsi1sk"
-    projection_type = "ALL"
+    name               = "GSI1"
+    hash_key           = "gsi1pk"
+    range_key          = "gsi1sk"
+    projection_type    = "INCLUDE"
+    non_key_attributes = [
+      "video_id",
+      "title",
+      "channel_title",
+      "published_at",
+      "summary",
+      "newsletter_sent_at",
+    ]
   }
 
   # TTL for automatic cleanup of old records
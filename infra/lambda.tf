@@ -140,7 +140,14 @@ resource "aws_lambda_function" "processor" {
 resource "aws_lambda_event_source_mapping" "processor_sqs" {
   event_source_arn = aws_sqs_queue.video_queue.arn
   function_name    = aws_lambda_function.processor.arn
-  batch_size       = 1 # Process one video at a time
+  batch_size       = var.processor_batch_size # Records run concurrently in the handler
+
+  # Consolidate low-traffic bursts into one invocation
+  maximum_batching_window_in_seconds = var.processor_batching_window_seconds
+
+  scaling_config {
+    maximum_concurrency = var.processor_max_concurrency
+  }
 
   # Enable partial batch failure reporting
   function_response_types = ["ReportBatchItemFailures"]
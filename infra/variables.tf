@@ -102,6 +102,34 @@ variable "sqs_message_retention_seconds" {
   default     = 345600 # 4 days
 }
 
+variable "processor_batch_size" {
+  description = "Maximum number of SQS messages delivered to one Processor invocation (1-10, MAX_CONCURRENT_RECORDS in the handler)"
+  type        = number
+  default     = 10
+
+  validation {
+    condition     = var.processor_batch_size >= 1 && var.processor_batch_size <= 10
+    error_message = "processor_batch_size must be between 1 and 10 (MAX_CONCURRENT_RECORDS in src/processor/handler.py), so every record of a batch runs in parallel."
+  }
+}
+
+variable "processor_batching_window_seconds" {
+  description = "How long SQS waits to fill a Processor batch before invoking (in seconds)"
+  type        = number
+  default     = 20
+}
+
+variable "processor_max_concurrency" {
+  description = "Maximum concurrent Processor invocations driven by SQS (min 2); bounds LLM request rate"
+  type        = number
+  default     = 5
+
+  validation {
+    condition     = var.processor_max_concurrency >= 2 && var.processor_max_concurrency <= 1000
+    error_message = "processor_max_concurrency must be between 2 and 1000 (AWS limits for SQS event source maximum concurrency)."
+  }
+}
+
 # -----------------------------------------------------------------------------
 # EventBridge Configuration
 # -----------------------------------------------------------------------------
@@ -595,8 +595,9 @@ function Invoke-NewsletterTestInsert {
     Write-Inf "Inserting test summary (ID: $videoId)..."
 
     $item = @{
-        pk = @{ S = "SUMMARY#$videoId" }
-        sk = @{ S = "DATA" }
+        pk = @{ S = "VIDEO#$videoId" }
+        sk = @{ S = "METADATA" }
+        status = @{ S = "PROCESSED" }
         gsi1pk = @{ S = "SUMMARY" }
         gsi1sk = @{ S = $now }
         video_id = @{ S = $videoId }
@@ -655,7 +656,7 @@ If you receive this email, the system is operational! 🎉
     }
 
     Write-Host ""
-    Write-Inf "Cleanup: aws dynamodb delete-item --table-name $Script:TABLE_NAME --key '{`"pk`":{`"S`":`"SUMMARY#$videoId`"},`"sk`":{`"S`":`"DATA`"}}'" 
+    Write-Inf "Cleanup: aws dynamodb delete-item --table-name $Script:TABLE_NAME --key '{`"pk`":{`"S`":`"VIDEO#$videoId`"},`"sk`":{`"S`":`"METADATA`"}}'" 
 }
 
 # =============================================================================
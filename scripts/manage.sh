@@ -505,8 +505,9 @@ cmd_newsletter() {
             item=$(python3 -c "
 import json
 item = {
-    'pk': {'S': 'SUMMARY#$video_id'},
-    'sk': {'S': 'DATA'},
+    'pk': {'S': 'VIDEO#$video_id'},
+    'sk': {'S': 'METADATA'},
+    'status': {'S': 'PROCESSED'},
     'gsi1pk': {'S': 'SUMMARY'},
     'gsi1sk': {'S': '$now'},
     'video_id': {'S': '$video_id'},
@@ -553,7 +554,7 @@ print(json.dumps(item))
             fi
 
             echo ""
-            print_inf "Cleanup: aws dynamodb delete-item --table-name $TABLE_NAME --key '{\"pk\":{\"S\":\"SUMMARY#$video_id\"},\"sk\":{\"S\":\"DATA\"}}'"
+            print_inf "Cleanup: aws dynamodb delete-item --table-name $TABLE_NAME --key '{\"pk\":{\"S\":\"VIDEO#$video_id\"},\"sk\":{\"S\":\"METADATA\"}}'"
             ;;
         *)
             print_err "Usage: ./manage.sh newsletter <frequency|test|test-insert> [value]"
@@ -5,7 +5,7 @@ Monthly cleanup of permanently failed records from DynamoDB.
 
 This Lambda is triggered by EventBridge on the 1st of each month. It:
 1. Scans for PERMANENTLY_FAILED videos (retries exhausted)
-2. Deletes both VIDEO#/METADATA and SUMMARY#/DATA records
+2. Deletes the VIDEO#/METADATA record (and any legacy SUMMARY#/DATA record)
 3. Reports cleanup statistics
 """
 
@@ -96,7 +96,7 @@ def cleanup_permanently_failed(table) -> dict:
                         }
                     )
 
-                    # Also delete the SUMMARY#<id>/DATA record if it exists
+                    # Also delete the legacy SUMMARY#<id>/DATA record if it exists
                     try:
                         table.delete_item(
                             Key={
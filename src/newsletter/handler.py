@@ -15,9 +15,11 @@ import json
 import logging
 import os
 import re
+import string
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from html import escape
-from typing import Any
+from typing import Any, Optional
 
 import boto3
 from botocore.exceptions import ClientError
@@ -49,6 +51,10 @@ SSM_USE_GMAIL_SMTP = os.environ.get("SSM_USE_GMAIL_SMTP", "/vidscribe/use_gmail_
 SSM_GMAIL_SENDER = os.environ.get("SSM_GMAIL_SENDER", "/vidscribe/gmail_sender")
 SSM_GMAIL_APP_PASSWORD = os.environ.get("SSM_GMAIL_APP_PASSWORD", "/vidscribe/gmail_app_password")
 
+# Summary attributes read by build_email_content (+ keys for mark_summaries_sent);
+# all of them are projected into GSI1 (see infra/dynamodb.tf)
+SUMMARY_PROJECTION = "pk, sk, video_id, title, channel_title, published_at, summary"
+
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(LOG_LEVEL)
@@ -306,11 +312,28 @@ NO_CONTENT_HTML = """
 </div>
 """
 
+# Templates split once into (literal, field) pairs, so rendering is a join
+# instead of re-parsing the large CSS-heavy shell on every .format() call
+_EMAIL_PARTS = [
+    (literal, field) for literal, field, _, _ in string.Formatter().parse(EMAIL_TEMPLATE)
+]
+_VIDEO_CARD_PARTS = [
+    (literal, field) for literal, field, _, _ in string.Formatter().parse(VIDEO_CARD_TEMPLATE)
+]
+
 # -----------------------------------------------------------------------------
 # Helper Functions
 # -----------------------------------------------------------------------------
 
 
+def render_template_parts(parts: list, values: dict) -> str:
+    """Fill pre-parsed template parts (same result as template.format(**values))."""
+    return "".join(
+        literal + str(values[field]) if field is not None else literal
+        for literal, field in parts
+    )
+
+
 def get_ssm_parameter(name: str, with_decryption: bool = False) -> str:
     """Retrieve a parameter from AWS SSM Parameter Store."""
     try:
@@ -321,22 +344,27 @@ def get_ssm_parameter(name: str, with_decryption: bool = False) -> str:
         raise
 
 
-def get_weekly_summaries(table) -> list[dict]:
+def get_weekly_summaries(table, now: Optional[datetime] = None) -> list[dict]:
     """
     Query DynamoDB for summaries from the last 7 days.
     
     Uses the GSI1 index where:
     - gsi1pk = "SUMMARY"
     - gsi1sk = ISO timestamp (for range queries)
+
+    Processed VIDEO#/METADATA records carry the GSI1 keys; SUMMARY#/DATA
+    records written by older versions are returned as well.
     
     Args:
         table: DynamoDB table resource
+        now: Invocation time (defaults to the current UTC time)
     
     Returns:
         List of summary records sorted by date (newest first)
     """
     # Calculate date range
-    now = datetime.now(timezone.utc)
+    if now is None:
+        now = datetime.now(timezone.utc)
     week_ago = now - timedelta(days=7)
     week_ago_iso = week_ago.isoformat()
     
@@ -348,6 +376,8 @@ def get_weekly_summaries(table) -> list[dict]:
             "IndexName": "GSI1",
             "KeyConditionExpression": "gsi1pk = :pk AND gsi1sk >= :start_date",
             "FilterExpression": "attribute_not_exists(newsletter_sent_at)",
+            # Only what the email and mark_summaries_sent read
+            "ProjectionExpression": SUMMARY_PROJECTION,
             "ExpressionAttributeValues": {
                 ":pk": "SUMMARY",
                 ":start_date": week_ago_iso
@@ -372,31 +402,35 @@ def get_weekly_summaries(table) -> list[dict]:
         return []
 
 
-def mark_summaries_sent(table, summaries: list[dict]) -> dict:
+def mark_summaries_sent(table, summaries: list[dict],
+                        now: Optional[datetime] = None) -> dict:
     """
     Mark summary records as sent so they are included in newsletters only once.
 
     Args:
         table: DynamoDB table resource
         summaries: Summaries successfully sent in email
+        now: Invocation time (defaults to the current UTC time)
 
     Returns:
         Dict with marking statistics.
     """
     stats = {"marked": 0, "errors": 0}
-    sent_at = datetime.now(timezone.utc).isoformat()
+    sent_at = (now or datetime.now(timezone.utc)).isoformat()
 
     for summary in summaries:
         video_id = summary.get("video_id")
-        if not video_id:
+        if not summary.get("pk") or not summary.get("sk"):
             stats["errors"] += 1
             continue
 
         try:
+            # Update the record the summary was read from (GSI items carry the
+            # table keys): VIDEO#/METADATA, or a legacy SUMMARY#/DATA record
             table.update_item(
                 Key={
-                    "pk": f"SUMMARY#{video_id}",
-                    "sk": "DATA"
+                    "pk": summary["pk"],
+                    "sk": summary["sk"]
                 },
                 UpdateExpression=(
                     "SET newsletter_sent_at = if_not_exists(newsletter_sent_at, :sent_at), "
@@ -522,9 +556,12 @@ def markdown_to_html_fallback(summary_text: str) -> str:
     return "\n".join(html_parts) if html_parts else "<p>No summary available.</p>"
 
 
+@lru_cache(maxsize=512)
 def format_date(iso_date: str) -> str:
     """
     Format an ISO date string for display.
+
+    Cached: a weekly digest repeats the same few publish dates.
     
     Args:
         iso_date: ISO 8601 date string
@@ -533,31 +570,38 @@ def format_date(iso_date: str) -> str:
         Human-readable date string (e.g., "Jan 15, 2024")
     """
     try:
-        dt = datetime.fromisoformat(iso_date.replace("Z", "+00:00"))
+        # Our writers emit isoformat() (+00:00); YouTube's published_at ends in Z
+        if iso_date.endswith("Z"):
+            dt = datetime.fromisoformat(iso_date[:-1] + "+00:00")
+        else:
+            dt = datetime.fromisoformat(iso_date)
         return dt.strftime("%b %d, %Y")
     except Exception:
         return iso_date
 
 
-def build_email_content(summaries: list[dict]) -> tuple[str, str]:
+def build_email_content(summaries: list[dict],
+                        now: Optional[datetime] = None) -> tuple[str, str]:
     """
     Build the HTML and plain text email content.
     
     Args:
         summaries: List of summary records from DynamoDB
+        now: Invocation time (defaults to the current UTC time)
     
     Returns:
         Tuple of (html_content, plain_text_content)
     """
-    now = datetime.now(timezone.utc)
+    if now is None:
+        now = datetime.now(timezone.utc)
     week_ago = now - timedelta(days=7)
     date_range = f"{week_ago.strftime('%b %d')} - {now.strftime('%b %d, %Y')}"
     
     if not summaries:
-        html = EMAIL_TEMPLATE.format(
-            date_range=date_range,
-            content=NO_CONTENT_HTML
-        )
+        html = render_template_parts(_EMAIL_PARTS, {
+            "date_range": date_range,
+            "content": NO_CONTENT_HTML
+        })
         plain = f"VidScribe Weekly Digest ({date_range})\n\nNo new videos this week."
         return html, plain
     
@@ -568,13 +612,13 @@ def build_email_content(summaries: list[dict]) -> tuple[str, str]:
     
     for i, summary in enumerate(summaries, 1):
         # HTML card
-        card = VIDEO_CARD_TEMPLATE.format(
-            video_id=summary.get("video_id", ""),
-            title=summary.get("title", "Untitled Video"),
-            channel=summary.get("channel_title", "Unknown Channel"),
-            published_date=format_date(summary.get("published_at", "")),
-            summary=format_summary_html(summary.get("summary", "No summary available."))
-        )
+        card = render_template_parts(_VIDEO_CARD_PARTS, {
+            "video_id": summary.get("video_id", ""),
+            "title": summary.get("title", "Untitled Video"),
+            "channel": summary.get("channel_title", "Unknown Channel"),
+            "published_date": format_date(summary.get("published_at", "")),
+            "summary": format_summary_html(summary.get("summary", "No summary available."))
+        })
         cards.append(card)
         
         # Plain text version
@@ -587,10 +631,10 @@ def build_email_content(summaries: list[dict]) -> tuple[str, str]:
     stats = f'<span class="stats-badge">📊 {len(summaries)} video(s) summarized</span>'
     intro = f"{stats}\n<p class=\"intro\">Here's what you missed from your favorite YouTube channels this week. Enjoy your personalized video summaries!</p>"
     
-    html = EMAIL_TEMPLATE.format(
-        date_range=date_range,
-        content=intro + "\n".join(cards)
-    )
+    html = render_template_parts(_EMAIL_PARTS, {
+        "date_range": date_range,
+        "content": intro + "\n".join(cards)
+    })
     
     plain = "\n".join(plain_parts)
     
@@ -681,14 +725,16 @@ def lambda_handler(event: dict, context: Any) -> dict:
         # Get DynamoDB table
         table = dynamodb.Table(DYNAMODB_TABLE_NAME)
         
+        # One timestamp for the whole run: query window, email dates, sent_at
+        now = datetime.now(timezone.utc)
+        
         # Query summaries from the last 7 days
-        summaries = get_weekly_summaries(table)
+        summaries = get_weekly_summaries(table, now)
         
         # Build email content
-        html_body, text_body = build_email_content(summaries)
+        html_body, text_body = build_email_content(summaries, now)
         
         # Generate subject line
-        now = datetime.now(timezone.utc)
         subject = f"📺 VidScribe Weekly Digest - {now.strftime('%b %d, %Y')}"
         
         if summaries:
@@ -728,7 +774,7 @@ def lambda_handler(event: dict, context: Any) -> dict:
             )
         
         if success:
-            mark_stats = mark_summaries_sent(table, summaries)
+            mark_stats = mark_summaries_sent(table, summaries, now)
             if mark_stats["errors"] > 0:
                 logger.warning(
                     f"Newsletter sent but failed to mark {mark_stats['errors']} summary record(s) as sent"
@@ -16,12 +16,14 @@ processing entire channel history on first deployment.
 import json
 import logging
 import os
-import urllib.request
+import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Optional
 
 import boto3
+import urllib3
 from botocore.exceptions import ClientError
 
 # -----------------------------------------------------------------------------
@@ -34,11 +36,14 @@ SQS_QUEUE_URL = os.environ.get("SQS_QUEUE_URL", "")
 SSM_YOUTUBE_CHANNELS = os.environ.get("SSM_YOUTUBE_CHANNELS", "/vidscribe/youtube_channels")
 SSM_YOUTUBE_API_KEY = os.environ.get("SSM_YOUTUBE_API_KEY", "/vidscribe/youtube_api_key")
 TTL_DAYS = int(os.environ.get("TTL_DAYS", "30"))
+TTL_SECONDS = TTL_DAYS * 24 * 60 * 60
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(LOG_LEVEL)
+# urllib3's "Retrying ..." warnings print the full request URL (API key included)
+logging.getLogger("urllib3").setLevel(logging.ERROR)
 
 # AWS clients
 ssm_client = boto3.client("ssm")
@@ -48,14 +53,45 @@ sqs_client = boto3.client("sqs")
 # YouTube API base URL
 YOUTUBE_API_BASE = "https://www.googleapis.com/youtube/v3"
 
+# Upper bound on channels polled in parallel within one invocation
+# (boto3's default pool of 10 connections covers the DynamoDB calls)
+MAX_CONCURRENT_CHANNELS = 8
+
+# Reused HTTPS connections to the YouTube API: one per channel worker, kept
+# across warm invocations instead of a new TLS handshake per channel.
+# urllib3 ships with botocore, so it is always available in the Lambda runtime.
+HTTP = urllib3.PoolManager(
+    maxsize=MAX_CONCURRENT_CHANNELS,
+    retries=urllib3.Retry(total=2, backoff_factor=0.3)
+)
+
+# How long a warm container reuses SSM values before reading them again (seconds)
+SSM_CACHE_TTL_SECONDS = 300
+
+# Shared compact encoder for SQS bodies: no whitespace and raw UTF-8 titles
+# (json.dumps with non-default options builds a new JSONEncoder on every call)
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
 # -----------------------------------------------------------------------------
 # Helper Functions
 # -----------------------------------------------------------------------------
 
 
+# (name, with_decryption) -> (monotonic fetch time, value)
+_ssm_cache: dict[tuple[str, bool], tuple[float, str]] = {}
+
+
+def clear_ssm_cache() -> None:
+    """Forget every cached SSM value (next lookups hit Parameter Store)."""
+    _ssm_cache.clear()
+
+
 def get_ssm_parameter(name: str, with_decryption: bool = False) -> str:
     """
     Retrieve a parameter from AWS SSM Parameter Store.
+
+    Values are cached for SSM_CACHE_TTL_SECONDS, so warm invocations skip the
+    round trip while rotated values are still picked up within a few minutes.
     
     Args:
         name: The parameter name/path
@@ -67,23 +103,35 @@ def get_ssm_parameter(name: str, with_decryption: bool = False) -> str:
     Raises:
         ClientError: If the parameter cannot be retrieved
     """
+    cache_key = (name, with_decryption)
+    cached = _ssm_cache.get(cache_key)
+    if cached is not None and time.monotonic() - cached[0] < SSM_CACHE_TTL_SECONDS:
+        return cached[1]
+
     try:
         response = ssm_client.get_parameter(Name=name, WithDecryption=with_decryption)
-        return response["Parameter"]["Value"]
+        value = response["Parameter"]["Value"]
     except ClientError as e:
         logger.error(f"Failed to get SSM parameter {name}: {e}")
         raise
 
+    _ssm_cache[cache_key] = (time.monotonic(), value)
+    return value
 
-def calculate_ttl() -> int:
+
+def calculate_ttl(now: Optional[datetime] = None) -> int:
     """
     Calculate the TTL timestamp for DynamoDB records.
     
+    Args:
+        now: Invocation time (defaults to the current UTC time)
+    
     Returns:
         Unix timestamp for when the record should expire
     """
-    expiry_time = datetime.now(timezone.utc) + timedelta(days=TTL_DAYS)
-    return int(expiry_time.timestamp())
+    if now is None:
+        now = datetime.now(timezone.utc)
+    return int(now.timestamp()) + TTL_SECONDS
 
 
 def get_youtube_videos(channel_id: str, api_key: str, published_after: str) -> list[dict]:
@@ -116,11 +164,16 @@ def get_youtube_videos(channel_id: str, api_key: str, published_after: str) -> l
     try:
         logger.info(f"Fetching videos for channel {channel_id} published after {published_after}")
         
-        request = urllib.request.Request(url)
-        request.add_header("Accept", "application/json")
+        response = HTTP.request("GET", url, headers={"Accept": "application/json"}, timeout=30.0)
+        if response.status >= 400:
+            logger.error(
+                f"YouTube API HTTP error for channel {channel_id}: {response.status} - {response.reason}"
+            )
+            logger.error(f"Error details: {response.data.decode('utf-8', 'replace')}")
+            return videos
         
-        with urllib.request.urlopen(request, timeout=30) as response:
-            data = json.loads(response.read().decode("utf-8"))
+        # json.loads accepts UTF-8 bytes directly: no intermediate str copy
+        data = json.loads(response.data)
         
         for item in data.get("items", []):
             video_id = item.get("id", {}).get("videoId")
@@ -138,16 +191,11 @@ def get_youtube_videos(channel_id: str, api_key: str, published_after: str) -> l
         
         logger.info(f"Found {len(videos)} videos for channel {channel_id}")
         
-    except urllib.error.HTTPError as e:
-        logger.error(f"YouTube API HTTP error for channel {channel_id}: {e.code} - {e.reason}")
-        # Read error response body if available
-        try:
-            error_body = e.read().decode("utf-8")
-            logger.error(f"Error details: {error_body}")
-        except Exception:
-            pass
-    except urllib.error.URLError as e:
-        logger.error(f"YouTube API URL error for channel {channel_id}: {e.reason}")
+    except urllib3.exceptions.HTTPError as e:
+        # str(e) embeds the request URL and with it the API key
+        reason = getattr(e, "reason", None)
+        cause = f": {type(reason).__name__}" if reason is not None else ""
+        logger.error(f"YouTube API connection error for channel {channel_id}: {type(e).__name__}{cause}")
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse YouTube API response: {e}")
     
@@ -178,35 +226,42 @@ def is_video_processed(table, video_id: str) -> bool:
         return False
 
 
-def mark_video_queued(table, video: dict) -> bool:
+def mark_video_queued(table, video: dict, now: Optional[datetime] = None) -> bool:
     """
     Mark a video as queued in DynamoDB to prevent duplicate processing.
     
+    Called from the channel worker threads: the write goes through the table's
+    client, since boto3 clients are thread-safe and resources are not (the
+    resource's client still accepts plain Python values).
+    
     Args:
-        table: DynamoDB table resource
+        table: DynamoDB table resource (only its name and client are used)
         video: Video dictionary with id, title, etc.
+        now: Invocation time (defaults to the current UTC time)
     
     Returns:
         True if successfully marked, False otherwise
     """
     try:
-        now = datetime.now(timezone.utc).isoformat()
-        ttl = calculate_ttl()
+        if now is None:
+            now = datetime.now(timezone.utc)
+        item = {
+            "pk": f"VIDEO#{video['video_id']}",
+            "sk": "METADATA",
+            "video_id": video["video_id"],
+            "title": video["title"],
+            "channel_id": video["channel_id"],
+            "channel_title": video["channel_title"],
+            "published_at": video["published_at"],
+            "description": video["description"],
+            "status": "QUEUED",
+            "queued_at": now.isoformat(),
+            "ttl": calculate_ttl(now)
+        }
         
-        table.put_item(
-            Item={
-                "pk": f"VIDEO#{video['video_id']}",
-                "sk": "METADATA",
-                "video_id": video["video_id"],
-                "title": video["title"],
-                "channel_id": video["channel_id"],
-                "channel_title": video["channel_title"],
-                "published_at": video["published_at"],
-                "description": video["description"],
-                "status": "QUEUED",
-                "queued_at": now,
-                "ttl": ttl
-            },
+        table.meta.client.put_item(
+            TableName=table.name,
+            Item=item,
             # Only write if the item doesn't already exist (idempotency)
             ConditionExpression="attribute_not_exists(pk)"
         )
@@ -219,9 +274,68 @@ def mark_video_queued(table, video: dict) -> bool:
         return False
 
 
+# SQS accepts at most 10 entries per SendMessageBatch request
+SQS_BATCH_SIZE = 10
+
+
+def build_sqs_entry(entry_id: str, video: dict) -> dict:
+    """Build a SendMessageBatch entry carrying the fields the Processor needs."""
+    entry = {
+        "Id": entry_id,
+        "MessageBody": _JSON_ENCODER.encode({
+            "video_id": video["video_id"],
+            "title": video["title"],
+            "channel_id": video["channel_id"],
+            "channel_title": video["channel_title"],
+            "published_at": video["published_at"]
+        })
+    }
+    if ".fifo" in SQS_QUEUE_URL:
+        entry["MessageGroupId"] = video["channel_id"]
+    return entry
+
+
+def send_to_sqs_batch(videos: list[dict]) -> list[dict]:
+    """
+    Send videos to the SQS queue for processing, up to 10 per request.
+    
+    Args:
+        videos: Video dictionaries to send
+    
+    Returns:
+        The videos that were successfully sent (failed ones are logged)
+    """
+    sent: list[dict] = []
+    for start in range(0, len(videos), SQS_BATCH_SIZE):
+        chunk = videos[start:start + SQS_BATCH_SIZE]
+        try:
+            response = sqs_client.send_message_batch(
+                QueueUrl=SQS_QUEUE_URL,
+                Entries=[build_sqs_entry(str(i), video) for i, video in enumerate(chunk)]
+            )
+        except ClientError as e:
+            logger.error(f"Error sending {len(chunk)} videos to SQS: {e}")
+            continue
+
+        failed_ids = set()
+        for failure in response.get("Failed", []):
+            failed_ids.add(failure["Id"])
+            video_id = chunk[int(failure["Id"])]["video_id"]
+            logger.error(
+                f"Error sending video {video_id} to SQS: "
+                f"{failure.get('Code')} - {failure.get('Message')}"
+            )
+
+        for i, video in enumerate(chunk):
+            if str(i) not in failed_ids:
+                logger.info(f"Sent video {video['video_id']} to SQS")
+                sent.append(video)
+    return sent
+
+
 def send_to_sqs(video: dict) -> bool:
     """
-    Send a video to the SQS queue for processing.
+    Send a single video to the SQS queue for processing.
     
     Args:
         video: Video dictionary to send
@@ -229,29 +343,41 @@ def send_to_sqs(video: dict) -> bool:
     Returns:
         True if successfully sent, False otherwise
     """
+    return bool(send_to_sqs_batch([video]))
+
+
+def poll_channel(table, channel_id: str, api_key: str, published_after: str,
+                 now: datetime) -> dict:
+    """
+    Fetch a channel's recent videos and mark the unseen ones as queued.
+    
+    Runs in a worker thread, so it only returns results: the caller merges
+    them into the invocation stats and sends new_videos to SQS.
+    
+    Returns:
+        Dict with videos_found, videos_skipped, errors and new_videos
+    """
+    result = {"videos_found": 0, "videos_skipped": 0, "errors": 0, "new_videos": []}
+    
     try:
-        message_body = json.dumps({
-            "video_id": video["video_id"],
-            "title": video["title"],
-            "channel_id": video["channel_id"],
-            "channel_title": video["channel_title"],
-            "published_at": video["published_at"]
-        })
+        # Fetch recent videos from YouTube
+        videos = get_youtube_videos(channel_id, api_key, published_after)
+        result["videos_found"] = len(videos)
         
-        sqs_client.send_message(
-            QueueUrl=SQS_QUEUE_URL,
-            MessageBody=message_body,
-            MessageGroupId=video["channel_id"] if ".fifo" in SQS_QUEUE_URL else None
-        ) if ".fifo" in SQS_QUEUE_URL else sqs_client.send_message(
-            QueueUrl=SQS_QUEUE_URL,
-            MessageBody=message_body
-        )
-        
-        logger.info(f"Sent video {video['video_id']} to SQS")
-        return True
-    except ClientError as e:
-        logger.error(f"Error sending video {video['video_id']} to SQS: {e}")
-        return False
+        # Process each video
+        for video in videos:
+            # Mark as queued in DynamoDB; the conditional put skips
+            # videos already known (idempotency) in one round trip
+            if mark_video_queued(table, video, now):
+                result["new_videos"].append(video)
+            else:
+                result["videos_skipped"] += 1
+                
+    except Exception as e:
+        logger.error(f"Error processing channel {channel_id}: {e}")
+        result["errors"] += 1
+    
+    return result
 
 
 # -----------------------------------------------------------------------------
@@ -299,37 +425,40 @@ def requeue_retryable_videos(table) -> dict:
 
         logger.info(f"Found {len(items)} retryable NO_TRANSCRIPT videos")
 
+        retry_videos = []
         for item in items:
             video_id = item.get("video_id", "")
             retry_count = int(item.get("retry_count", 0))
 
-            video_data = {
+            retry_videos.append({
                 "video_id": video_id,
                 "title": item.get("title", f"Retry: {video_id}"),
                 "channel_id": item.get("channel_id", "RETRY"),
                 "channel_title": item.get("channel_title", "Retry"),
                 "published_at": item.get("published_at", now_iso)
-            }
+            })
 
             logger.info(
                 f"Re-queuing video {video_id} for transcript retry "
                 f"(attempt {retry_count + 1})"
             )
 
-            if send_to_sqs(video_data):
-                # Update status to QUEUED to prevent re-processing until handled
-                try:
-                    table.update_item(
-                        Key={"pk": f"VIDEO#{video_id}", "sk": "METADATA"},
-                        UpdateExpression="SET #s = :status",
-                        ExpressionAttributeNames={"#s": "status"},
-                        ExpressionAttributeValues={":status": "QUEUED"}
-                    )
-                    stats["requeued"] += 1
-                except Exception as e:
-                    logger.error(f"Failed to update status for requeued video {video_id}: {e}")
-                    stats["errors"] += 1
-            else:
+        sent = send_to_sqs_batch(retry_videos)
+        stats["errors"] += len(retry_videos) - len(sent)
+
+        for video in sent:
+            video_id = video["video_id"]
+            # Update status to QUEUED to prevent re-processing until handled
+            try:
+                table.update_item(
+                    Key={"pk": f"VIDEO#{video_id}", "sk": "METADATA"},
+                    UpdateExpression="SET #s = :status",
+                    ExpressionAttributeNames={"#s": "status"},
+                    ExpressionAttributeValues={":status": "QUEUED"}
+                )
+                stats["requeued"] += 1
+            except Exception as e:
+                logger.error(f"Failed to update status for requeued video {video_id}: {e}")
                 stats["errors"] += 1
 
     except Exception as e:
@@ -391,43 +520,38 @@ def lambda_handler(event: dict, context: Any) -> dict:
         
         logger.info(f"Monitoring {len(channel_ids)} channels")
         
+        # One timestamp for the whole run: cutoff, queued_at and TTLs
+        now = datetime.now(timezone.utc)
+        
         # Calculate the cutoff time (24 hours ago in ISO 8601 format)
-        published_after = (datetime.now(timezone.utc) - timedelta(hours=24)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        published_after = (now - timedelta(hours=24)).strftime("%Y-%m-%dT%H:%M:%SZ")
         
         # Get DynamoDB table
         table = dynamodb.Table(DYNAMODB_TABLE_NAME)
         
-        # Process each channel
-        for channel_id in channel_ids:
-            stats["channels_checked"] += 1
-            
-            try:
-                # Fetch recent videos from YouTube
-                videos = get_youtube_videos(channel_id, youtube_api_key, published_after)
-                stats["videos_found"] += len(videos)
+        # Poll channels concurrently: each one is dominated by network waits
+        # (YouTube API, DynamoDB), so threads overlap them well
+        max_workers = max(1, min(MAX_CONCURRENT_CHANNELS, len(channel_ids)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(poll_channel, table, channel_id, youtube_api_key, published_after, now)
+                for channel_id in channel_ids
+            ]
+            # Send each channel's new videos as soon as it is done: they are
+            # already marked QUEUED, so waiting for the slowest channel would
+            # widen the window in which a timeout strands them outside SQS
+            for future in as_completed(futures):
+                result = future.result()
+                stats["channels_checked"] += 1
+                stats["videos_found"] += result["videos_found"]
+                stats["videos_skipped"] += result["videos_skipped"]
+                stats["errors"] += result["errors"]
                 
-                # Process each video
-                for video in videos:
-                    # Check if already processed (idempotency)
-                    if is_video_processed(table, video["video_id"]):
-                        logger.debug(f"Skipping already processed video: {video['video_id']}")
-                        stats["videos_skipped"] += 1
-                        continue
-                    
-                    # Mark as queued in DynamoDB
-                    if mark_video_queued(table, video):
-                        # Send to SQS for processing
-                        if send_to_sqs(video):
-                            stats["videos_queued"] += 1
-                            logger.info(f"Queued video: {video['title']} ({video['video_id']})")
-                        else:
-                            stats["errors"] += 1
-                    else:
-                        stats["videos_skipped"] += 1
-                        
-            except Exception as e:
-                logger.error(f"Error processing channel {channel_id}: {e}")
-                stats["errors"] += 1
+                sent = send_to_sqs_batch(result["new_videos"])
+                stats["videos_queued"] += len(sent)
+                stats["errors"] += len(result["new_videos"]) - len(sent)
+                for video in sent:
+                    logger.info(f"Queued video: {video['title']} ({video['video_id']})")
 
         # Re-queue retryable NO_TRANSCRIPT failures
         retry_stats = requeue_retryable_videos(table)
@@ -12,15 +12,23 @@ This Lambda is triggered by SQS when new videos are queued. It:
 Dependencies are provided via a Lambda Layer.
 """
 
+import hashlib
+import io
 import json
 import logging
 import os
-import urllib.request
-import urllib.parse
+import string
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from typing import Any, Optional
 
 import boto3
+import urllib3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # Import youtube-transcript-api from Lambda Layer
@@ -28,20 +36,30 @@ try:
     from youtube_transcript_api import YouTubeTranscriptApi
     from youtube_transcript_api.proxies import WebshareProxyConfig, GenericProxyConfig
     from youtube_transcript_api._errors import (
-        NoTranscriptFound,
         TranscriptsDisabled,
         VideoUnavailable,
         IpBlocked,
         RequestBlocked,
+        NotTranslatable,
+        TranslationLanguageNotAvailable,
     )
 except ImportError:
-    # Fallback for local testing
+    # Layer missing or broken: get_transcript raises DependencyMissingError so
+    # messages are classified DEPENDENCY_MISSING instead of the module failing
+    # at import. The placeholder error type is never raised, so the narrow
+    # except clauses cannot swallow unrelated exceptions.
+    class _TranscriptApiUnavailable(Exception):
+        """Placeholder for youtube-transcript-api error types."""
+
     YouTubeTranscriptApi = None
     WebshareProxyConfig = None
     GenericProxyConfig = None
-    NoTranscriptFound = Exception
-    TranscriptsDisabled = Exception
-    VideoUnavailable = Exception
+    TranscriptsDisabled = _TranscriptApiUnavailable
+    VideoUnavailable = _TranscriptApiUnavailable
+    IpBlocked = _TranscriptApiUnavailable
+    RequestBlocked = _TranscriptApiUnavailable
+    NotTranslatable = _TranscriptApiUnavailable
+    TranslationLanguageNotAvailable = _TranscriptApiUnavailable
 
 # -----------------------------------------------------------------------------
 # Configuration
@@ -59,6 +77,35 @@ LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 MAX_TRANSCRIPT_RETRIES = 3
 RETRY_SCHEDULE_DAYS = [1, 3, 5]  # days to wait after each attempt
 
+# Transcript languages accepted without translation, in order of preference
+TRANSCRIPT_LANGUAGES = ["en", "en-US", "en-GB"]
+
+# Size limits (UTF-8 bytes) for failure details stored on video records
+MAX_ERROR_BYTES = 500
+MAX_FAILURE_REASON_BYTES = 100
+
+# Transcripts shorter than this (characters) are stored as-is instead of summarized
+MIN_TRANSCRIPT_CHARS = 500
+
+# Transcript length sent to the LLM (characters), to stay within context limits
+MAX_TRANSCRIPT_CHARS = 30000
+TRANSCRIPT_TRUNCATION_MARKER = "... [transcript truncated]"
+
+# Upper bound on SQS records processed in parallel within one invocation
+# (infra/variables.tf caps processor_batch_size at this value)
+MAX_CONCURRENT_RECORDS = 10
+
+# How long a warm container reuses SSM values before reading them again (seconds)
+SSM_CACHE_TTL_SECONDS = 300
+
+# Names accepted by a single SSM GetParameters call
+SSM_GET_PARAMETERS_MAX = 10
+
+# Videos processed by this warm container, remembered to ack redeliveries
+# without any DynamoDB or LLM call
+RECENT_VIDEOS_MAX = 1024
+RECENT_VIDEOS_TTL_SECONDS = 300
+
 # Proxy configuration (SSM Parameter Names)
 SSM_PROXY_TYPE = os.environ.get("SSM_PROXY_TYPE", "/vidscribe/proxy_type")
 SSM_WEBSHARE_USERNAME = os.environ.get("SSM_WEBSHARE_USERNAME", "/vidscribe/webshare_username")
@@ -69,10 +116,49 @@ SSM_GENERIC_PROXY_HTTPS_URL = os.environ.get("SSM_GENERIC_PROXY_HTTPS_URL", "/vi
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(LOG_LEVEL)
+# urllib3's "Retrying ..." warnings print the full request URL
+logging.getLogger("urllib3").setLevel(logging.ERROR)
+
+# AWS clients: created lazily on first use and sharing one session, so warm
+# invocations that never reach SSM/DynamoDB don't pay for building them and
+# credential/endpoint resolution is done once for both
+_aws_session = boto3.session.Session()
+
+# Each client is shared by all record worker threads: room for every
+# concurrently processed record, with headroom for the occasional
+# overlapping calls of one record
+_aws_config = Config(max_pool_connections=2 * MAX_CONCURRENT_RECORDS)
+
+
+@lru_cache(maxsize=None)
+def get_ssm_client():
+    """Return the shared SSM client, creating it on first use."""
+    return _aws_session.client("ssm", config=_aws_config)
+
+
+@lru_cache(maxsize=None)
+def get_table():
+    """
+    Return the videos table resource, reused across warm invocations.
+
+    boto3 resources are not thread-safe, so record workers only use it for its
+    name and its client (`table.meta.client`): clients are thread-safe, and the
+    resource's client still accepts and returns plain Python values.
+    """
+    return _aws_session.resource("dynamodb", config=_aws_config).Table(DYNAMODB_TABLE_NAME)
+
+
+# Pooled HTTP client for LLM calls: keeps TLS connections alive across calls
+# and warm invocations instead of a new handshake per summary. urllib3 ships
+# with botocore, so it is always available in the Lambda runtime.
+# HTTP/1.1 needs one connection per in-flight request: keep one per worker
+# thread, so a warm container reuses all of them on the next batch.
+HTTP = urllib3.PoolManager(
+    maxsize=MAX_CONCURRENT_RECORDS,
+    block=False,
+    retries=urllib3.Retry(total=2, backoff_factor=0.3)
+)
 
-# AWS clients
-ssm_client = boto3.client("ssm")
-dynamodb = boto3.resource("dynamodb")
 
 # LLM API endpoints
 LLM_ENDPOINTS = {
@@ -80,6 +166,17 @@ LLM_ENDPOINTS = {
     "groq": "https://api.groq.com/openai/v1/chat/completions"
 }
 
+# Request body parts identical for every summary: built once and shared by
+# all payloads (they are only serialized, never mutated)
+GEMINI_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "maxOutputTokens": 1024
+}
+GROQ_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a helpful assistant that creates concise, informative summaries."
+}
+
 # Default summarization prompt
 SUMMARIZATION_PROMPT = """You are a professional content curator and newsletter writer. 
 Your goal is to transform YouTube transcripts into clear, structured, and highly readable summaries.
@@ -104,6 +201,12 @@ Transcript:
 
 Please provide the newsletter-ready summary in {language}:"""
 
+# SUMMARIZATION_PROMPT split once into (literal text, field name) pairs, so
+# building a prompt is a plain concatenation instead of re-parsing the template
+_PROMPT_PARTS = [
+    (literal, field) for literal, field, _, _ in string.Formatter().parse(SUMMARIZATION_PROMPT)
+]
+
 class TranscriptBlockedError(Exception):
     """Raised when YouTube blocks transcript requests from the current IP/network."""
 
@@ -111,14 +214,37 @@ class TranscriptBlockedError(Exception):
 class DependencyMissingError(Exception):
     """Raised when required runtime dependencies are not available in Lambda."""
 
+
+class LLMHTTPError(Exception):
+    """Raised when an LLM endpoint answers with a non-2xx HTTP status."""
+
+    def __init__(self, status: int, reason: str, body: str):
+        super().__init__(f"{status} - {reason}")
+        self.status = status
+        self.reason = reason
+        self.body = body
+
 # -----------------------------------------------------------------------------
 # Helper Functions
 # -----------------------------------------------------------------------------
 
 
+# (name, with_decryption) -> (monotonic fetch time, value)
+_ssm_cache: dict[tuple[str, bool], tuple[float, str]] = {}
+
+
+def clear_ssm_cache() -> None:
+    """Forget every cached SSM value (next lookups hit Parameter Store)."""
+    _ssm_cache.clear()
+    parse_llm_config.cache_clear()
+
+
 def get_ssm_parameter(name: str, with_decryption: bool = False) -> str:
     """
     Retrieve a parameter from AWS SSM Parameter Store.
+
+    Values are cached for SSM_CACHE_TTL_SECONDS, so warm invocations skip the
+    round trip while rotated values are still picked up within a few minutes.
     
     Args:
         name: The parameter name/path
@@ -127,17 +253,114 @@ def get_ssm_parameter(name: str, with_decryption: bool = False) -> str:
     Returns:
         The parameter value as a string
     """
+    cache_key = (name, with_decryption)
+    cached = _ssm_cache.get(cache_key)
+    if cached is not None and time.monotonic() - cached[0] < SSM_CACHE_TTL_SECONDS:
+        return cached[1]
+
     try:
-        response = ssm_client.get_parameter(Name=name, WithDecryption=with_decryption)
-        return response["Parameter"]["Value"]
+        response = get_ssm_client().get_parameter(Name=name, WithDecryption=with_decryption)
+        value = response["Parameter"]["Value"]
     except ClientError as e:
-        logger.error(f"Failed to get SSM parameter {name}: {e}")
+        logger.error("Failed to get SSM parameter %s: %s", name, e)
         raise
 
+    _ssm_cache[cache_key] = (time.monotonic(), value)
+    return value
+
+
+def get_ssm_parameters(names: list[str], with_decryption: bool = True) -> dict[str, str]:
+    """
+    Retrieve several SSM parameters with as few GetParameters round trips as possible.
+
+    Shares the get_ssm_parameter cache; only names missing or expired there
+    are fetched, SSM_GET_PARAMETERS_MAX (the GetParameters limit) per call.
+
+    Returns:
+        Dict mapping each name to its value
+
+    Raises:
+        LookupError: if any parameter does not exist
+    """
+    now = time.monotonic()
+    values = {}
+    missing = []
+    for name in names:
+        cached = _ssm_cache.get((name, with_decryption))
+        if cached is not None and now - cached[0] < SSM_CACHE_TTL_SECONDS:
+            values[name] = cached[1]
+        else:
+            missing.append(name)
+
+    for start in range(0, len(missing), SSM_GET_PARAMETERS_MAX):
+        chunk = missing[start:start + SSM_GET_PARAMETERS_MAX]
+        try:
+            response = get_ssm_client().get_parameters(Names=chunk, WithDecryption=with_decryption)
+        except ClientError as e:
+            logger.error("Failed to get SSM parameters %s: %s", chunk, e)
+            raise
+        if response.get("InvalidParameters"):
+            raise LookupError(f"SSM parameters not found: {response['InvalidParameters']}")
+
+        fetched_at = time.monotonic()
+        for parameter in response["Parameters"]:
+            values[parameter["Name"]] = parameter["Value"]
+            _ssm_cache[(parameter["Name"], with_decryption)] = (fetched_at, parameter["Value"])
+
+    return values
+
 
-def calculate_ttl() -> int:
-    """Calculate TTL timestamp for DynamoDB records."""
-    expiry_time = datetime.now(timezone.utc) + timedelta(days=TTL_DAYS)
+# video_id -> monotonic time it was saved, oldest first (guarded by the lock:
+# records of a batch run in worker threads)
+_recent_videos: OrderedDict[str, float] = OrderedDict()
+_recent_videos_lock = threading.Lock()
+
+
+def clear_recent_videos() -> None:
+    """Forget every recently processed video."""
+    with _recent_videos_lock:
+        _recent_videos.clear()
+
+
+def was_recently_processed(video_id: str) -> bool:
+    """Whether this container saved the video within RECENT_VIDEOS_TTL_SECONDS."""
+    with _recent_videos_lock:
+        saved_at = _recent_videos.get(video_id)
+    return saved_at is not None and time.monotonic() - saved_at < RECENT_VIDEOS_TTL_SECONDS
+
+
+def remember_processed(video_id: str) -> None:
+    """Record a saved video, evicting the oldest entries beyond RECENT_VIDEOS_MAX."""
+    with _recent_videos_lock:
+        _recent_videos[video_id] = time.monotonic()
+        _recent_videos.move_to_end(video_id)
+        while len(_recent_videos) > RECENT_VIDEOS_MAX:
+            _recent_videos.popitem(last=False)
+
+
+@lru_cache(maxsize=4)
+def parse_llm_config(llm_config_json: str) -> dict:
+    """Decode the LLM configuration JSON, once per distinct value. Treat the result as read-only."""
+    return json.loads(llm_config_json)
+
+
+def truncate_utf8(text: str, max_bytes: int) -> str:
+    """
+    Trim text to at most max_bytes of UTF-8 (how DynamoDB sizes attributes),
+    never splitting a character. Short strings are returned as-is.
+    """
+    if len(text) * 4 <= max_bytes:
+        # Even all 4-byte characters would fit: skip the encode
+        return text
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max_bytes].decode("utf-8", "ignore")
+
+
+def calculate_ttl(now: Optional[datetime] = None) -> int:
+    """Calculate TTL timestamp for DynamoDB records, relative to `now` when given."""
+    expiry_time = (now or datetime.now(timezone.utc)) + timedelta(days=TTL_DAYS)
     return int(expiry_time.timestamp())
 
 
@@ -180,10 +403,64 @@ def get_proxy_config() -> Optional[Any]:
         return None
         
     except Exception as e:
-        logger.error(f"Failed to load proxy configuration: {e}")
+        logger.error("Failed to load proxy configuration: %s", e)
         return None
 
 
+def select_transcript(transcript_list) -> Optional[Any]:
+    """
+    Pick the best transcript from a TranscriptList in a single pass.
+
+    Order of preference:
+    1. Manually created transcript in one of TRANSCRIPT_LANGUAGES
+    2. Auto-generated transcript in one of TRANSCRIPT_LANGUAGES
+    3. First available transcript, translated to English
+
+    Returns:
+        A Transcript object ready to fetch(), or None if nothing is usable.
+    """
+    available = list(transcript_list)
+    manual = {t.language_code: t for t in available if not t.is_generated}
+    generated = {t.language_code: t for t in available if t.is_generated}
+
+    for candidates in (manual, generated):
+        for language_code in TRANSCRIPT_LANGUAGES:
+            if language_code in candidates:
+                return candidates[language_code]
+
+    if available:
+        try:
+            return available[0].translate("en")
+        except (NotTranslatable, TranslationLanguageNotAvailable) as e:
+            logger.warning("Could not translate transcript: %s", e)
+
+    return None
+
+
+def join_snippets(snippets, max_chars: int = MAX_TRANSCRIPT_CHARS) -> str:
+    """
+    Join transcript snippets with spaces, truncating at max_chars.
+
+    Snippets are streamed into a buffer and iteration stops at the limit, so
+    memory stays bounded by max_chars however long the video is. Line breaks
+    inside multi-line captions become spaces (one pass over the final text).
+    """
+    buffer = io.StringIO()
+    written = 0
+    separator = ""
+    for snippet in snippets:
+        piece = separator + snippet.text
+        separator = " "
+        if written + len(piece) > max_chars:
+            buffer.write(piece[:max_chars - written])
+            buffer.write(TRANSCRIPT_TRUNCATION_MARKER)
+            logger.info("Truncating transcript to %d chars", max_chars)
+            break
+        buffer.write(piece)
+        written += len(piece)
+    return buffer.getvalue().replace("\n", " ")
+
+
 def get_transcript(video_id: str) -> Optional[str]:
     """
     Download the transcript for a YouTube video using youtube-transcript-api.
@@ -212,11 +489,11 @@ def get_transcript(video_id: str) -> Optional[str]:
         try:
             proxy_config = get_proxy_config()
             if proxy_config:
-                logger.info(f"Using proxy for video {video_id}")
+                logger.info("Using proxy for video %s", video_id)
             else:
                 logger.info("No proxy configured. Using direct connection.")
         except Exception as e:
-            logger.error(f"Failed to get proxy config: {e}. Defaulting to no proxy.")
+            logger.error("Failed to get proxy config: %s. Defaulting to no proxy.", e)
             proxy_config = None
         
         # Create API instance with or without proxy
@@ -227,38 +504,16 @@ def get_transcript(video_id: str) -> Optional[str]:
 
         # New API: list available transcripts
         transcript_list = ytt_api.list(video_id)
-
-        transcript = None
-
-        try:
-            transcript = transcript_list.find_manually_created_transcript(["en", "en-US", "en-GB"])
-        except NoTranscriptFound:
-            try:
-                transcript = transcript_list.find_generated_transcript(["en", "en-US", "en-GB"])
-            except NoTranscriptFound:
-                # Try any transcript and translate to English
-                try:
-                    for t in transcript_list:
-                        transcript = t.translate("en")
-                        break
-                except Exception as e:
-                    logger.warning(f"Could not translate transcript: {e}")
+        transcript = select_transcript(transcript_list)
 
         if transcript is None:
-            logger.warning(f"No usable transcript found for video {video_id}")
+            logger.warning("No usable transcript found for video %s", video_id)
             return None
 
         # New API: fetch() returns snippet objects with a .text attribute
-        transcript_snippets = transcript.fetch()
-        full_text = " ".join([s.text for s in transcript_snippets])
+        full_text = join_snippets(transcript.fetch())
 
-        # Truncate for LLM context limits
-        max_chars = 30000
-        if len(full_text) > max_chars:
-            logger.info(f"Truncating transcript from {len(full_text)} to {max_chars} chars")
-            full_text = full_text[:max_chars] + "... [transcript truncated]"
-
-        logger.info(f"Successfully retrieved transcript for video {video_id} ({len(full_text)} chars)")
+        logger.info("Successfully retrieved transcript for video %s (%d chars)", video_id, len(full_text))
         return full_text
 
     except (IpBlocked, RequestBlocked) as e:
@@ -268,19 +523,105 @@ def get_transcript(video_id: str) -> Optional[str]:
         raise TranscriptBlockedError(msg) from e
 
     except TranscriptsDisabled:
-        logger.warning(f"Transcripts are disabled for video {video_id}")
+        logger.warning("Transcripts are disabled for video %s", video_id)
         return None
 
     except VideoUnavailable:
-        logger.warning(f"Video {video_id} is unavailable")
+        logger.warning("Video %s is unavailable", video_id)
         return None
 
     except Exception as e:
-        logger.error(f"Error getting transcript for video {video_id}: {e}")
+        logger.error("Error getting transcript for video %s: %s", video_id, e)
         return None
 
 
 
+# Shared compact encoder: json.dumps with non-default options builds a new
+# JSONEncoder on every call
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+# Number of leading _PROMPT_PARTS that depend only on the language (the fixed
+# instructions): that head is rendered once per language and reused
+_PROMPT_HEAD_LENGTH = next(
+    (i for i, (_, field) in enumerate(_PROMPT_PARTS) if field not in (None, "language")),
+    len(_PROMPT_PARTS)
+)
+_PROMPT_TAIL_PARTS = _PROMPT_PARTS[_PROMPT_HEAD_LENGTH:]
+
+
+def _render_prompt_parts(parts: list, values: dict) -> str:
+    return "".join(
+        literal + values[field] if field is not None else literal
+        for literal, field in parts
+    )
+
+
+@lru_cache(maxsize=8)
+def _prompt_head(language: str) -> str:
+    """Fixed instructions of SUMMARIZATION_PROMPT for one output language."""
+    return _render_prompt_parts(_PROMPT_PARTS[:_PROMPT_HEAD_LENGTH], {"language": language})
+
+
+def build_prompt(transcript: str, title: str, channel: str, language: str) -> str:
+    """Fill SUMMARIZATION_PROMPT (same result as SUMMARIZATION_PROMPT.format)."""
+    values = {
+        "title": title,
+        "channel": channel,
+        "transcript": transcript,
+        "language": language
+    }
+    return _prompt_head(language) + _render_prompt_parts(_PROMPT_TAIL_PARTS, values)
+
+
+def describe_http_error(error: urllib3.exceptions.HTTPError) -> str:
+    """
+    Describe a urllib3 error without its request URL.
+
+    MaxRetryError messages embed the full URL (query string included), so
+    only the exception type and the type of the underlying reason are reported.
+    """
+    reason = getattr(error, "reason", None)
+    if reason is None:
+        return type(error).__name__
+    return f"{type(error).__name__}: {type(reason).__name__}"
+
+
+def post_json(url: str, payload: dict, headers: Optional[dict] = None,
+              timeout: float = 60.0) -> dict:
+    """
+    POST a JSON payload to an LLM endpoint and decode the JSON response.
+
+    Single transport entry point for all LLM providers, so connection handling
+    can be tuned in one place.
+
+    Args:
+        url: Endpoint URL
+        payload: Request body, serialized as JSON
+        headers: Extra request headers (e.g. Authorization)
+        timeout: Socket timeout in seconds
+
+    Returns:
+        The decoded JSON response
+
+    Raises:
+        LLMHTTPError: On non-2xx responses
+        urllib3.exceptions.HTTPError: On connection errors
+    """
+    # Raw UTF-8 instead of \uXXXX escapes: non-English transcripts would
+    # otherwise grow up to 6 bytes per character on the wire
+    data = _JSON_ENCODER.encode(payload).encode("utf-8")
+    request_headers = {"Content-Type": "application/json; charset=utf-8"}
+    request_headers.update(headers or {})
+
+    response = HTTP.request("POST", url, body=data, headers=request_headers, timeout=timeout)
+    if response.status >= 400:
+        raise LLMHTTPError(response.status, response.reason, response.data.decode("utf-8", "replace"))
+
+    # json.loads accepts UTF-8 bytes directly: no intermediate str copy
+    return json.loads(response.data)
+
+
 def summarize_with_gemini(transcript: str, title: str, channel: str, 
                           api_key: str, model: str, language: str) -> Optional[str]:
     """
@@ -297,14 +638,10 @@ def summarize_with_gemini(transcript: str, title: str, channel: str,
     Returns:
         The generated summary, or None on error
     """
-    prompt = SUMMARIZATION_PROMPT.format(
-        title=title,
-        channel=channel,
-        transcript=transcript,
-        language=language
-    )
+    prompt = build_prompt(transcript, title, channel, language)
     
-    url = LLM_ENDPOINTS["gemini"].format(model=model) + f"?key={api_key}"
+    # Key in a header, not the query string: urllib3 errors include the URL
+    url = LLM_ENDPOINTS["gemini"].format(model=model)
     
     payload = {
         "contents": [{
@@ -312,41 +649,28 @@ def summarize_with_gemini(transcript: str, title: str, channel: str,
                 "text": prompt
             }]
         }],
-        "generationConfig": {
-            "temperature": 0.7,
-            "maxOutputTokens": 1024
-        }
+        "generationConfig": GEMINI_GENERATION_CONFIG
     }
     
     try:
-        data = json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(url, data=data)
-        request.add_header("Content-Type", "application/json")
-        
-        with urllib.request.urlopen(request, timeout=60) as response:
-            result = json.loads(response.read().decode("utf-8"))
+        result = post_json(url, payload, headers={"x-goog-api-key": api_key})
         
         # Extract text from Gemini response
-        candidates = result.get("candidates", [])
-        if candidates:
-            content = candidates[0].get("content", {})
-            parts = content.get("parts", [])
-            if parts:
-                return parts[0].get("text", "")
+        try:
+            return result["candidates"][0]["content"]["parts"][0]["text"]
+        except (KeyError, IndexError, TypeError):
+            logger.warning("Unexpected Gemini response format: %s", result)
+            return None
         
-        logger.warning(f"Unexpected Gemini response format: {result}")
+    except LLMHTTPError as e:
+        logger.error("Gemini API HTTP error: %s - %s", e.status, e.reason)
+        logger.error("Error details: %s", e.body)
         return None
-        
-    except urllib.error.HTTPError as e:
-        logger.error(f"Gemini API HTTP error: {e.code} - {e.reason}")
-        try:
-            error_body = e.read().decode("utf-8")
-            logger.error(f"Error details: {error_body}")
-        except Exception:
-            pass
+    except urllib3.exceptions.HTTPError as e:
+        logger.error("Error calling Gemini API: %s", describe_http_error(e))
         return None
     except Exception as e:
-        logger.error(f"Error calling Gemini API: {e}")
+        logger.error("Error calling Gemini API: %s", e)
         return None
 
 
@@ -366,22 +690,14 @@ def summarize_with_groq(transcript: str, title: str, channel: str,
     Returns:
         The generated summary, or None on error
     """
-    prompt = SUMMARIZATION_PROMPT.format(
-        title=title,
-        channel=channel,
-        transcript=transcript,
-        language=language
-    )
+    prompt = build_prompt(transcript, title, channel, language)
     
     url = LLM_ENDPOINTS["groq"]
     
     payload = {
         "model": model,
         "messages": [
-            {
-                "role": "system",
-                "content": "You are a helpful assistant that creates concise, informative summaries."
-            },
+            GROQ_SYSTEM_MESSAGE,
             {
                 "role": "user",
                 "content": prompt
@@ -392,33 +708,24 @@ def summarize_with_groq(transcript: str, title: str, channel: str,
     }
     
     try:
-        data = json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(url, data=data)
-        request.add_header("Content-Type", "application/json")
-        request.add_header("Authorization", f"Bearer {api_key}")
-        
-        with urllib.request.urlopen(request, timeout=60) as response:
-            result = json.loads(response.read().decode("utf-8"))
+        result = post_json(url, payload, headers={"Authorization": f"Bearer {api_key}"})
         
         # Extract text from Groq/OpenAI-compatible response
-        choices = result.get("choices", [])
-        if choices:
-            message = choices[0].get("message", {})
-            return message.get("content", "")
+        try:
+            return result["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            logger.warning("Unexpected Groq response format: %s", result)
+            return None
         
-        logger.warning(f"Unexpected Groq response format: {result}")
+    except LLMHTTPError as e:
+        logger.error("Groq API HTTP error: %s - %s", e.status, e.reason)
+        logger.error("Error details: %s", e.body)
         return None
-        
-    except urllib.error.HTTPError as e:
-        logger.error(f"Groq API HTTP error: {e.code} - {e.reason}")
-        try:
-            error_body = e.read().decode("utf-8")
-            logger.error(f"Error details: {error_body}")
-        except Exception:
-            pass
+    except urllib3.exceptions.HTTPError as e:
+        logger.error("Error calling Groq API: %s", describe_http_error(e))
         return None
     except Exception as e:
-        logger.error(f"Error calling Groq API: {e}")
+        logger.error("Error calling Groq API: %s", e)
         return None
 
 
@@ -441,90 +748,151 @@ def generate_summary(transcript: str, title: str, channel: str,
     model = llm_config.get("model", "gemini-flash-latest")
     language = llm_config.get("language", "English")
     
-    logger.info(f"Generating summary using {provider} ({model}) in {language}")
+    logger.info("Generating summary using %s (%s) in %s", provider, model, language)
     
     if provider == "gemini":
         return summarize_with_gemini(transcript, title, channel, api_key, model, language)
     elif provider == "groq":
         return summarize_with_groq(transcript, title, channel, api_key, model, language)
     else:
-        logger.error(f"Unknown LLM provider: {provider}")
+        logger.error("Unknown LLM provider: %s", provider)
         return None
 
 
-def save_summary(table, video: dict, summary: str) -> bool:
+def llm_cache_key(transcript: str, title: str, channel: str, llm_config: dict) -> str:
+    """
+    Build the response cache key for a video summarized with a given LLM setup.
+
+    The key covers every input of build_prompt (transcript, title, channel and
+    output language) plus the provider and model, so a hit is always a summary
+    produced from the same prompt. Fields are NUL-separated, since titles may
+    contain any printable character.
+    """
+    provider = llm_config.get("provider", "gemini").lower()
+    model = llm_config.get("model", "gemini-flash-latest")
+    language = llm_config.get("language", "English")
+    header = "\0".join((provider, model, language, title, channel, ""))
+    digest = hashlib.sha256(header.encode("utf-8"))
+    digest.update(transcript.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_cached_summary(table, cache_key: str) -> Optional[str]:
+    """
+    Look up a previously generated summary in the LLM response cache.
+
+    Returns:
+        The cached summary, or None on miss or error
+    """
+    try:
+        response = table.meta.client.get_item(
+            TableName=table.name,
+            Key={
+                "pk": f"LLMCACHE#{cache_key}",
+                "sk": "DATA"
+            },
+            ProjectionExpression="summary"
+        )
+    except ClientError as e:
+        logger.warning("Error reading LLM cache entry %s: %s", cache_key, e)
+        return None
+    return response.get("Item", {}).get("summary")
+
+
+def cache_summary(table, cache_key: str, summary: str, now: Optional[datetime] = None) -> None:
+    """
+    Store a generated summary in the LLM response cache.
+
+    Entries expire with the same TTL as video records; a failed write only
+    costs a future cache miss, so errors are logged and ignored.
+    """
+    try:
+        table.meta.client.put_item(
+            TableName=table.name,
+            Item={
+                "pk": f"LLMCACHE#{cache_key}",
+                "sk": "DATA",
+                "summary": summary,
+                "ttl": calculate_ttl(now)
+            }
+        )
+    except ClientError as e:
+        logger.warning("Error writing LLM cache entry %s: %s", cache_key, e)
+
+
+def save_summary(table, video: dict, summary: str, now: Optional[datetime] = None) -> bool:
     """
     Save the video summary to DynamoDB.
     
-    Creates two records:
-    1. Updates the video METADATA record with status "PROCESSED"
-    2. Creates a SUMMARY record for efficient querying by date
+    Updates the video METADATA record in a single write: status "PROCESSED",
+    the summary, and the GSI1 keys (gsi1pk="SUMMARY", gsi1sk=timestamp) that
+    make it queryable by date for the newsletter. The video fields are set
+    too, so the GSI projection is complete even without a prior QUEUED record.
     
     Args:
         table: DynamoDB table resource
         video: Video metadata dictionary
         summary: The generated summary text
+        now: Invocation timestamp shared across the batch (defaults to current time)
     
     Returns:
         True if successful, False otherwise
     """
     try:
-        now = datetime.now(timezone.utc)
+        now = now or datetime.now(timezone.utc)
         now_iso = now.isoformat()
-        ttl = calculate_ttl()
+        # Replaces the TTL the poller set at queue time: a processed video
+        # expires TTL_DAYS after it was summarized, not after it was queued
+        ttl = calculate_ttl(now)
         
-        # Update the video metadata to mark as processed
-        table.update_item(
+        table.meta.client.update_item(
+            TableName=table.name,
             Key={
                 "pk": f"VIDEO#{video['video_id']}",
                 "sk": "METADATA"
             },
-            UpdateExpression="SET #status = :status, processed_at = :processed_at, summary = :summary",
+            UpdateExpression=(
+                "SET #status = :status, processed_at = :now, summary = :summary, "
+                "summarized_at = :now, gsi1pk = :gsi1pk, gsi1sk = :now, #ttl = :ttl, "
+                "video_id = :video_id, title = :title, channel_id = :channel_id, "
+                "channel_title = :channel_title, published_at = :published_at"
+            ),
             ExpressionAttributeNames={
-                "#status": "status"
+                "#status": "status",
+                "#ttl": "ttl"
             },
             ExpressionAttributeValues={
                 ":status": "PROCESSED",
-                ":processed_at": now_iso,
-                ":summary": summary
-            }
-        )
-        
-        # Create a summary record for GSI querying (for newsletter)
-        table.put_item(
-            Item={
-                "pk": f"SUMMARY#{video['video_id']}",
-                "sk": "DATA",
-                "gsi1pk": "SUMMARY",  # Partition key for GSI
-                "gsi1sk": now_iso,     # Sort key for date range queries
-                "video_id": video["video_id"],
-                "title": video["title"],
-                "channel_id": video["channel_id"],
-                "channel_title": video["channel_title"],
-                "published_at": video["published_at"],
-                "summary": summary,
-                "summarized_at": now_iso,
-                "ttl": ttl
+                ":now": now_iso,
+                ":summary": summary,
+                ":gsi1pk": "SUMMARY",  # Partition key for GSI (newsletter query)
+                ":ttl": ttl,
+                ":video_id": video["video_id"],
+                ":title": video["title"],
+                ":channel_id": video["channel_id"],
+                ":channel_title": video["channel_title"],
+                ":published_at": video["published_at"]
             }
         )
         
-        logger.info(f"Saved summary for video {video['video_id']}")
+        logger.info("Saved summary for video %s", video['video_id'])
         return True
         
     except ClientError as e:
-        logger.error(f"Error saving summary for video {video['video_id']}: {e}")
+        logger.error("Error saving summary for video %s: %s", video['video_id'], e)
         return False
 
 
-def get_retry_state(table, video_id: str) -> dict:
+def get_video_state(table, video_id: str) -> dict:
     """
-    Get the current retry state for a video from DynamoDB.
+    Get the current processing/retry state for a video from DynamoDB.
 
     Returns:
-        Dict with retry_count, first_failed_at, failure_reason, or empty dict if not found.
+        Dict with retry_count, first_failed_at, failure_reason, status, or empty dict on error.
     """
     try:
-        response = table.get_item(
+        response = table.meta.client.get_item(
+            TableName=table.name,
             Key={
                 "pk": f"VIDEO#{video_id}",
                 "sk": "METADATA"
@@ -540,11 +908,12 @@ def get_retry_state(table, video_id: str) -> dict:
             "status": item.get("status", "")
         }
     except ClientError as e:
-        logger.error(f"Error getting retry state for video {video_id}: {e}")
+        logger.error("Error getting state for video %s: %s", video_id, e)
         return {}
 
 
-def mark_video_failed(table, video_id: str, error: str, failure_reason: str = "FAILED") -> None:
+def mark_video_failed(table, video_id: str, error: str, failure_reason: str = "FAILED",
+                      now: Optional[datetime] = None) -> None:
     """
     Mark a video as failed in DynamoDB.
 
@@ -559,43 +928,60 @@ def mark_video_failed(table, video_id: str, error: str, failure_reason: str = "F
       - TRANSCRIPTS_DISABLED
       - VIDEO_UNAVAILABLE
       - UNKNOWN
+
+    `now` is the invocation timestamp shared across the batch (defaults to current time).
     """
-    now = datetime.now(timezone.utc)
+    now = now or datetime.now(timezone.utc)
     now_iso = now.isoformat()
+    error = truncate_utf8(error, MAX_ERROR_BYTES)
 
     try:
         if failure_reason == "NO_TRANSCRIPT":
-            # Get current retry state
-            state = get_retry_state(table, video_id)
-            current_retry = state.get("retry_count", 0)
-            first_failed = state.get("first_failed_at", "") or now_iso
-
-            new_retry_count = current_retry + 1
+            # Record the attempt with an atomic counter: no read-before-write,
+            # and concurrent deliveries cannot lose an increment. The stale
+            # next_retry_at is removed so the poller cannot requeue the video
+            # before the follow-up update below schedules (or ends) the retries
+            response = table.meta.client.update_item(
+                TableName=table.name,
+                Key={"pk": f"VIDEO#{video_id}", "sk": "METADATA"},
+                UpdateExpression=(
+                    "ADD retry_count :one "
+                    "SET #status = :status, #error = :error, "
+                    "failure_reason = :reason, failed_at = :failed_at, "
+                    "first_failed_at = if_not_exists(first_failed_at, :failed_at) "
+                    "REMOVE next_retry_at"
+                ),
+                ExpressionAttributeNames={
+                    "#status": "status",
+                    "#error": "error"
+                },
+                ExpressionAttributeValues={
+                    ":one": 1,
+                    ":status": "FAILED",
+                    ":error": error,
+                    ":reason": "NO_TRANSCRIPT",
+                    ":failed_at": now_iso
+                },
+                ReturnValues="UPDATED_NEW"
+            )
+            new_retry_count = int(response["Attributes"]["retry_count"])
 
             if new_retry_count >= MAX_TRANSCRIPT_RETRIES:
                 # Exhausted all retries → mark as permanently failed
                 logger.warning(
-                    f"Video {video_id} exhausted {MAX_TRANSCRIPT_RETRIES} transcript retries. "
-                    f"Marking as PERMANENTLY_FAILED."
+                    "Video %s exhausted %d transcript retries. Marking as PERMANENTLY_FAILED.",
+                    video_id, MAX_TRANSCRIPT_RETRIES
                 )
-                table.update_item(
+                table.meta.client.update_item(
+                    TableName=table.name,
                     Key={"pk": f"VIDEO#{video_id}", "sk": "METADATA"},
-                    UpdateExpression=(
-                        "SET #status = :status, #error = :error, "
-                        "failure_reason = :reason, failed_at = :failed_at, "
-                        "retry_count = :retry_count, first_failed_at = :first_failed"
-                    ),
+                    UpdateExpression="SET #status = :status, failure_reason = :reason",
                     ExpressionAttributeNames={
-                        "#status": "status",
-                        "#error": "error"
+                        "#status": "status"
                     },
                     ExpressionAttributeValues={
                         ":status": "PERMANENTLY_FAILED",
-                        ":error": error[:500],
-                        ":reason": "NO_TRANSCRIPT_EXHAUSTED",
-                        ":failed_at": now_iso,
-                        ":retry_count": new_retry_count,
-                        ":first_failed": first_failed
+                        ":reason": "NO_TRANSCRIPT_EXHAUSTED"
                     }
                 )
             else:
@@ -605,34 +991,21 @@ def mark_video_failed(table, video_id: str, error: str, failure_reason: str = "F
                 next_retry_iso = next_retry.isoformat()
 
                 logger.info(
-                    f"Video {video_id} NO_TRANSCRIPT attempt {new_retry_count}/{MAX_TRANSCRIPT_RETRIES}. "
-                    f"Next retry at {next_retry_iso}"
+                    "Video %s NO_TRANSCRIPT attempt %d/%d. Next retry at %s",
+                    video_id, new_retry_count, MAX_TRANSCRIPT_RETRIES, next_retry_iso
                 )
-                table.update_item(
+                table.meta.client.update_item(
+                    TableName=table.name,
                     Key={"pk": f"VIDEO#{video_id}", "sk": "METADATA"},
-                    UpdateExpression=(
-                        "SET #status = :status, #error = :error, "
-                        "failure_reason = :reason, failed_at = :failed_at, "
-                        "retry_count = :retry_count, first_failed_at = :first_failed, "
-                        "next_retry_at = :next_retry"
-                    ),
-                    ExpressionAttributeNames={
-                        "#status": "status",
-                        "#error": "error"
-                    },
+                    UpdateExpression="SET next_retry_at = :next_retry",
                     ExpressionAttributeValues={
-                        ":status": "FAILED",
-                        ":error": error[:500],
-                        ":reason": "NO_TRANSCRIPT",
-                        ":failed_at": now_iso,
-                        ":retry_count": new_retry_count,
-                        ":first_failed": first_failed,
                         ":next_retry": next_retry_iso
                     }
                 )
         else:
             # Non-retryable failure — mark immediately
-            table.update_item(
+            table.meta.client.update_item(
+                TableName=table.name,
                 Key={"pk": f"VIDEO#{video_id}", "sk": "METADATA"},
                 UpdateExpression=(
                     "SET #status = :status, #error = :error, "
@@ -644,13 +1017,143 @@ def mark_video_failed(table, video_id: str, error: str, failure_reason: str = "F
                 },
                 ExpressionAttributeValues={
                     ":status": "FAILED",
-                    ":error": error[:500],
-                    ":reason": failure_reason[:100],
+                    ":error": error,
+                    ":reason": truncate_utf8(failure_reason, MAX_FAILURE_REASON_BYTES),
                     ":failed_at": now_iso
                 }
             )
     except ClientError as e:
-        logger.error(f"Error marking video {video_id} as failed: {e}")
+        logger.error("Error marking video %s as failed: %s", video_id, e)
+
+
+def get_llm_summary(table, video: dict, transcript: str, llm_config: dict,
+                    llm_api_key: str, now: datetime) -> Optional[str]:
+    """
+    Return the LLM summary for a transcript, from the response cache when the
+    same video was already summarized with the same setup (redelivery,
+    retries, DLQ replay), otherwise by calling the LLM and caching the result.
+
+    Returns:
+        The summary, or None if generation failed
+    """
+    cache_key = llm_cache_key(transcript, video["title"], video["channel_title"], llm_config)
+    summary = get_cached_summary(table, cache_key)
+    if summary is not None:
+        logger.info("Reusing cached summary for video %s", video['video_id'])
+        return summary
+
+    summary = generate_summary(
+        transcript=transcript,
+        title=video["title"],
+        channel=video["channel_title"],
+        llm_config=llm_config,
+        api_key=llm_api_key
+    )
+    if summary is not None:
+        cache_summary(table, cache_key, summary, now=now)
+    return summary
+
+
+def process_record(record: dict, table, llm_config: dict, llm_api_key: str,
+                   now: datetime) -> bool:
+    """
+    Process a single SQS record:
+    1. Downloads the transcript
+    2. Generates a summary using an LLM
+    3. Stores the result in DynamoDB
+    
+    Args:
+        record: SQS record containing the video message
+        table: DynamoDB table resource
+        llm_config: Configuration dict with provider and model
+        llm_api_key: LLM API key
+        now: Invocation timestamp shared across the batch
+    
+    Returns:
+        True if the message is settled (processed, or failed without retry),
+        False if SQS should redeliver it
+    """
+    message_id = record["messageId"]
+
+    # Producers can pre-classify a message as "skip" via a message attribute:
+    # acknowledge it without parsing the body
+    attributes = record.get("messageAttributes") or {}
+    if attributes.get("skip", {}).get("stringValue") == "true":
+        logger.info("Skipping message %s flagged by producer", message_id)
+        return True
+    
+    try:
+        # Parse the video data from the SQS message
+        video = json.loads(record["body"])
+        video_id = video["video_id"]
+        
+        logger.info("Processing video: %s (%s)", video['title'], video_id)
+
+        # Redelivery of a video this container just saved: ack without any I/O
+        if was_recently_processed(video_id):
+            logger.info("Video %s processed moments ago, skipping duplicate delivery", video_id)
+            return True
+
+        # Producers may hint that the video has no captions at all: skip the
+        # transcript listing round trip. Messages without the hint are unaffected.
+        if video.get("has_captions") is False:
+            error_msg = "Producer reported no captions available"
+            logger.warning("%s for video %s", error_msg, video_id)
+            mark_video_failed(table, video_id, error_msg, failure_reason="NO_TRANSCRIPT", now=now)
+            return True
+
+        # Duplicate delivery of an already summarized video: nothing left to do
+        if get_video_state(table, video_id).get("status") == "PROCESSED":
+            logger.info("Video %s already processed, skipping", video_id)
+            return True
+        
+        # Step 1: Download the transcript
+        try:
+            transcript = get_transcript(video_id)
+        except DependencyMissingError as e:
+            logger.error("Processor dependency missing for video %s: %s", video_id, e)
+            mark_video_failed(table, video_id, str(e), failure_reason="DEPENDENCY_MISSING", now=now)
+            return True
+        except TranscriptBlockedError as e:
+            # Cloud IP blocked: don't retry forever; classify explicitly
+            logger.warning("Transcript blocked for video %s: %s", video_id, e)
+            mark_video_failed(table, video_id, str(e), failure_reason="YOUTUBE_BLOCKED", now=now)
+            return True
+
+        if transcript is None:
+            error_msg = "Failed to retrieve transcript"
+            logger.warning("%s for video %s", error_msg, video_id)
+            mark_video_failed(table, video_id, error_msg, failure_reason="NO_TRANSCRIPT", now=now)
+            return True
+
+        # Step 2: Generate summary with LLM, unless the transcript is too short
+        # to be worth summarizing
+        if len(transcript) < MIN_TRANSCRIPT_CHARS:
+            logger.info("Transcript for video %s too short, skipping LLM", video_id)
+            summary = f"*Transcript too short for summarization.* {transcript}"
+        else:
+            summary = get_llm_summary(table, video, transcript, llm_config, llm_api_key, now)
+            if summary is None:
+                error_msg = "Failed to generate summary"
+                logger.error("%s for video %s", error_msg, video_id)
+                # Let SQS retry
+                return False
+        
+        # Step 3: Save to DynamoDB
+        if not save_summary(table, video, summary, now=now):
+            return False
+        remember_processed(video_id)
+        
+        logger.info("Successfully processed video: %s", video_id)
+        return True
+        
+    except json.JSONDecodeError as e:
+        logger.error("Invalid JSON in SQS message: %s", e)
+        # Don't retry malformed messages
+        return True
+    except Exception as e:
+        logger.error("Error processing message %s: %s", message_id, e, exc_info=True)
+        return False
 
 
 # -----------------------------------------------------------------------------
@@ -662,10 +1165,8 @@ def lambda_handler(event: dict, context: Any) -> dict:
     """
     Main Lambda handler function.
     
-    Processes a single video from the SQS queue:
-    1. Downloads the transcript
-    2. Generates a summary using an LLM
-    3. Stores the result in DynamoDB
+    Loads the LLM configuration once, then processes the SQS records
+    concurrently (see process_record).
     
     Args:
         event: SQS event containing the video message
@@ -675,27 +1176,28 @@ def lambda_handler(event: dict, context: Any) -> dict:
         Dictionary with batch item failures for partial batch reporting
     """
     logger.info("Starting Processor Lambda execution")
-    logger.debug(f"Event: {json.dumps(event)}")
+    logger.info("Received %d records", len(event.get("Records", [])))
+    # Guard the dump: an SQS batch can be several MB and f-strings are always evaluated
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Event: %s", json.dumps(event))
     
     # Track failed items for partial batch reporting
     batch_item_failures = []
     
-    # Get DynamoDB table
-    table = dynamodb.Table(DYNAMODB_TABLE_NAME)
+    # Single timestamp for every DynamoDB write in this invocation
+    now = datetime.now(timezone.utc)
     
     # Load LLM configuration
     try:
-        llm_config_json = get_ssm_parameter(SSM_LLM_CONFIG)
-        llm_config = json.loads(llm_config_json)
-        llm_api_key = get_ssm_parameter(SSM_LLM_API_KEY, with_decryption=True)
-        
-        llm_api_key = get_ssm_parameter(SSM_LLM_API_KEY, with_decryption=True)
-        
-        # Log proxy configuration status
-        # Note: Actual proxy details are fetched inside get_transcript to keep main handler clean
+        # One round trip for both (decryption is a no-op for the plain String config)
+        parameters = get_ssm_parameters([SSM_LLM_CONFIG, SSM_LLM_API_KEY])
+        llm_config = parse_llm_config(parameters[SSM_LLM_CONFIG])
+        llm_api_key = parameters[SSM_LLM_API_KEY]
+
+        # Note: proxy details are fetched inside get_transcript to keep the main handler clean
 
     except Exception as e:
-        logger.error(f"Failed to load LLM configuration: {e}")
+        logger.error("Failed to load LLM configuration: %s", e)
         # Fail all items if we can't get configuration
         for record in event.get("Records", []):
             batch_item_failures.append({
@@ -703,76 +1205,26 @@ def lambda_handler(event: dict, context: Any) -> dict:
             })
         return {"batchItemFailures": batch_item_failures}
     
-    # Process each SQS message
-    for record in event.get("Records", []):
-        message_id = record["messageId"]
-        
-        try:
-            # Parse the video data from the SQS message
-            video = json.loads(record["body"])
-            video_id = video["video_id"]
-            
-            logger.info(f"Processing video: {video['title']} ({video_id})")
-            
-            # Step 1: Download the transcript
-            try:
-                transcript = get_transcript(video_id)
-            except DependencyMissingError as e:
-                logger.error(f"Processor dependency missing for video {video_id}: {e}")
-                mark_video_failed(table, video_id, str(e), failure_reason="DEPENDENCY_MISSING")
-                continue
-            except TranscriptBlockedError as e:
-                # Cloud IP blocked: don't retry forever; classify explicitly
-                logger.warning(f"Transcript blocked for video {video_id}: {e}")
-                mark_video_failed(table, video_id, str(e), failure_reason="YOUTUBE_BLOCKED")
-                continue
-
-            if transcript is None:
-                error_msg = "Failed to retrieve transcript"
-                logger.warning(f"{error_msg} for video {video_id}")
-                mark_video_failed(table, video_id, error_msg, failure_reason="NO_TRANSCRIPT")
-                continue
-
-            
-            # Step 2: Generate summary with LLM
-            summary = generate_summary(
-                transcript=transcript,
-                title=video["title"],
-                channel=video["channel_title"],
-                llm_config=llm_config,
-                api_key=llm_api_key
-            )
-            
-            if summary is None:
-                error_msg = "Failed to generate summary"
-                logger.error(f"{error_msg} for video {video_id}")
-                # Add to failures to retry
-                batch_item_failures.append({
-                    "itemIdentifier": message_id
-                })
-                continue
-            
-            # Step 3: Save to DynamoDB
-            if not save_summary(table, video, summary):
+    # Shared by the record workers, which only go through its thread-safe client
+    table = get_table()
+
+    # Process the SQS messages concurrently: each one is dominated by network
+    # waits (YouTube, LLM API, DynamoDB), so threads overlap them well
+    records = event.get("Records", [])
+    max_workers = max(1, min(MAX_CONCURRENT_RECORDS, len(records)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda record: process_record(record, table, llm_config, llm_api_key, now),
+            records
+        )
+        for record, done in zip(records, results):
+            if not done:
                 batch_item_failures.append({
-                    "itemIdentifier": message_id
+                    "itemIdentifier": record["messageId"]
                 })
-                continue
-            
-            logger.info(f"Successfully processed video: {video_id}")
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in SQS message: {e}")
-            # Don't retry malformed messages
-            continue
-        except Exception as e:
-            logger.error(f"Error processing message {message_id}: {e}", exc_info=True)
-            batch_item_failures.append({
-                "itemIdentifier": message_id
-            })
     
     # Return batch item failures for SQS to requeue
     if batch_item_failures:
-        logger.warning(f"Returning {len(batch_item_failures)} failed items for retry")
+        logger.warning("Returning %d failed items for retry", len(batch_item_failures))
     
     return {"batchItemFailures": batch_item_failures}
@@ -6,207 +6,351 @@ Shared fixtures for testing Lambda functions with mocked AWS services.
 
 import json
 import os
+import sys
 import pytest
 import boto3
 from moto import mock_aws
+from moto.dynamodb.models import dynamodb_backends
+from moto.sqs.models import sqs_backends
+from moto.ssm.models import ssm_backends
 from datetime import datetime, timezone
+from types import SimpleNamespace
 
 
 # -----------------------------------------------------------------------------
-# Environment Variables Fixture
+# Environment Variables
 # -----------------------------------------------------------------------------
 
+TEST_ENVIRONMENT = {
+    # Fake AWS credentials for moto
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_SECURITY_TOKEN": "testing",
+    "AWS_SESSION_TOKEN": "testing",
+    "AWS_DEFAULT_REGION": "eu-west-1",
+    # Lambda function configuration
+    "DYNAMODB_TABLE_NAME": "vidscribe-test-videos",
+    "SQS_QUEUE_URL": "https://sqs.eu-west-1.amazonaws.com/123456789012/vidscribe-test-queue",
+    "SSM_YOUTUBE_CHANNELS": "/vidscribe/youtube_channels",
+    "SSM_YOUTUBE_API_KEY": "/vidscribe/youtube_api_key",
+    "SSM_LLM_CONFIG": "/vidscribe/llm_config",
+    "SSM_LLM_API_KEY": "/vidscribe/llm_api_key",
+    "SSM_DESTINATION_EMAIL": "/vidscribe/destination_email",
+    "SSM_SENDER_EMAIL": "/vidscribe/sender_email",
+    "TTL_DAYS": "30",
+    "LOG_LEVEL": "DEBUG",
+}
+
+
+def pytest_configure(config):
+    """
+    Set fake AWS credentials and Lambda environment variables once per run.
+
+    Runs before test modules are collected, so handlers imported at module
+    top already read the test configuration (and build their clients with it).
+    """
+    os.environ.update(TEST_ENVIRONMENT)
+
+
+# -----------------------------------------------------------------------------
+# Moto Session
+# -----------------------------------------------------------------------------
+
+# Identities verified once per session (SES state is never reset between tests)
+SES_VERIFIED_EMAILS = ("sender@example.com", "test@example.com")
+
+# Backends holding per-test state, wiped after each test that touched them
+_RESET_BACKENDS = (dynamodb_backends, sqs_backends, ssm_backends)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def moto_session():
+    """Mock AWS once for the whole run instead of per test/fixture."""
+    # No test runs Lambda/Batch code: never let moto reach for Docker
+    mock = mock_aws(config={
+        "batch": {"use_docker": False},
+        "lambda": {"use_docker": False}
+    })
+    mock.start()
+
+    ses = boto3.client("ses", region_name="eu-west-1")
+    for email in SES_VERIFIED_EMAILS:
+        ses.verify_email_identity(EmailAddress=email)
+
+    yield mock
+    mock.stop()
+
+
 @pytest.fixture(autouse=True)
-def aws_credentials():
-    """Set fake AWS credentials for moto."""
-    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
-    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
-    os.environ["AWS_SECURITY_TOKEN"] = "testing"
-    os.environ["AWS_SESSION_TOKEN"] = "testing"
-    os.environ["AWS_DEFAULT_REGION"] = "eu-west-1"
+def reset_moto():
+    """Wipe mocked AWS resources after each test (nested mock_aws() does not)."""
+    yield
+    for backends in _RESET_BACKENDS:
+        # Backends are created lazily per account: empty means untouched
+        if not backends:
+            continue
+        for account_backends in backends.values():
+            account_backends.reset()
+        backends.clear()
 
 
 @pytest.fixture(autouse=True)
-def environment_variables():
-    """Set environment variables for Lambda functions."""
-    os.environ["DYNAMODB_TABLE_NAME"] = "vidscribe-test-videos"
-    os.environ["SQS_QUEUE_URL"] = "https://sqs.eu-west-1.amazonaws.com/123456789012/vidscribe-test-queue"
-    os.environ["SSM_YOUTUBE_CHANNELS"] = "/vidscribe/youtube_channels"
-    os.environ["SSM_YOUTUBE_API_KEY"] = "/vidscribe/youtube_api_key"
-    os.environ["SSM_LLM_CONFIG"] = "/vidscribe/llm_config"
-    os.environ["SSM_LLM_API_KEY"] = "/vidscribe/llm_api_key"
-    os.environ["SSM_DESTINATION_EMAIL"] = "/vidscribe/destination_email"
-    os.environ["SSM_SENDER_EMAIL"] = "/vidscribe/sender_email"
-    os.environ["TTL_DAYS"] = "30"
-    os.environ["LOG_LEVEL"] = "DEBUG"
+def clear_warm_caches():
+    """Drop state cached by warm-container handlers between tests."""
+    yield
+    processor = sys.modules.get("src.processor.handler")
+    if processor is not None:
+        processor.clear_ssm_cache()
+        processor.clear_recent_videos()
+    poller = sys.modules.get("src.poller.handler")
+    if poller is not None:
+        poller.clear_ssm_cache()
 
 
 # -----------------------------------------------------------------------------
 # DynamoDB Fixtures
 # -----------------------------------------------------------------------------
 
+TABLE_NAME = "vidscribe-test-videos"
+
+# GSI1 as defined in infra/dynamodb.tf (newsletter query by summary date)
+GSI1 = {
+    "IndexName": "GSI1",
+    "KeySchema": [
+        {"AttributeName": "gsi1pk", "KeyType": "HASH"},
+        {"AttributeName": "gsi1sk", "KeyType": "RANGE"}
+    ],
+    "Projection": {
+        "ProjectionType": "INCLUDE",
+        "NonKeyAttributes": [
+            "video_id", "title", "channel_title", "published_at",
+            "summary", "newsletter_sent_at"
+        ]
+    },
+    "ProvisionedThroughput": {
+        "ReadCapacityUnits": 5,
+        "WriteCapacityUnits": 5
+    }
+}
+
+
+@pytest.fixture(scope="session")
+def dynamodb_resource(moto_session):
+    """Return one mocked DynamoDB resource for the whole run."""
+    return boto3.resource("dynamodb", region_name="eu-west-1")
+
+
 @pytest.fixture
-def dynamodb_table():
-    """Create a mocked DynamoDB table."""
-    with mock_aws():
-        dynamodb = boto3.resource("dynamodb", region_name="eu-west-1")
-        
-        table = dynamodb.create_table(
-            TableName="vidscribe-test-videos",
+def table_factory(dynamodb_resource):
+    """
+    Return a function creating the mocked videos table (optionally with GSI1).
+
+    Moto creates tables synchronously, so no table_exists waiter is needed.
+    """
+    def make_table(name: str = TABLE_NAME, with_gsi: bool = False):
+        attribute_definitions = [
+            {"AttributeName": "pk", "AttributeType": "S"},
+            {"AttributeName": "sk", "AttributeType": "S"}
+        ]
+        extra_args = {}
+        if with_gsi:
+            attribute_definitions += [
+                {"AttributeName": "gsi1pk", "AttributeType": "S"},
+                {"AttributeName": "gsi1sk", "AttributeType": "S"}
+            ]
+            extra_args["GlobalSecondaryIndexes"] = [GSI1]
+
+        return dynamodb_resource.create_table(
+            TableName=name,
             KeySchema=[
                 {"AttributeName": "pk", "KeyType": "HASH"},
                 {"AttributeName": "sk", "KeyType": "RANGE"}
             ],
-            AttributeDefinitions=[
-                {"AttributeName": "pk", "AttributeType": "S"},
-                {"AttributeName": "sk", "AttributeType": "S"},
-                {"AttributeName": "gsi1pk", "AttributeType": "S"},
-                {"AttributeName": "gsi1sk", "AttributeType": "S"}
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    "IndexName": "GSI1",
-                    "KeySchema": [
-                        {"AttributeName": "gsi1pk", "KeyType": "HASH"},
-                        {"AttributeName": "gsi1sk", "KeyType": "RANGE"}
-                    ],
-                    "Projection": {"ProjectionType": "ALL"},
-                    "ProvisionedThroughput": {
-                        "ReadCapacityUnits": 5,
-                        "WriteCapacityUnits": 5
-                    }
-                }
-            ],
+            AttributeDefinitions=attribute_definitions,
             ProvisionedThroughput={
                 "ReadCapacityUnits": 5,
                 "WriteCapacityUnits": 5
-            }
+            },
+            **extra_args
         )
-        
-        table.meta.client.get_waiter("table_exists").wait(TableName="vidscribe-test-videos")
-        
-        yield table
+
+    return make_table
+
+
+@pytest.fixture
+def dynamodb_table(table_factory):
+    """Create a mocked DynamoDB table with GSI1."""
+    return table_factory(with_gsi=True)
+
+
+@pytest.fixture
+def dynamodb_table_simple(table_factory):
+    """Create a mocked DynamoDB table without GSI1 (key lookups only)."""
+    return table_factory()
 
 
 # -----------------------------------------------------------------------------
 # SQS Fixtures
 # -----------------------------------------------------------------------------
 
+@pytest.fixture(scope="session")
+def sqs_client(moto_session):
+    """Return one mocked SQS client for the whole run."""
+    return boto3.client("sqs", region_name="eu-west-1")
+
+
 @pytest.fixture
-def sqs_queue():
+def sqs_queue(sqs_client, monkeypatch):
     """Create a mocked SQS queue."""
-    with mock_aws():
-        sqs = boto3.client("sqs", region_name="eu-west-1")
-        
-        # Create main queue
-        response = sqs.create_queue(QueueName="vidscribe-test-queue")
-        queue_url = response["QueueUrl"]
-        
-        # Update environment variable
-        os.environ["SQS_QUEUE_URL"] = queue_url
-        
-        yield sqs, queue_url
+    sqs = sqs_client
+    
+    # Create main queue
+    response = sqs.create_queue(QueueName="vidscribe-test-queue")
+    queue_url = response["QueueUrl"]
+    
+    # Point the poller at it for this test only (the handler reads
+    # SQS_QUEUE_URL once at import, so the environment variable is not enough)
+    monkeypatch.setattr("src.poller.handler.SQS_QUEUE_URL", queue_url)
+    
+    yield sqs, queue_url
 
 
 # -----------------------------------------------------------------------------
 # SSM Parameter Store Fixtures
 # -----------------------------------------------------------------------------
 
+@pytest.fixture(scope="session")
+def ssm_client(moto_session):
+    """Return one mocked SSM client for the whole run."""
+    return boto3.client("ssm", region_name="eu-west-1")
+
+
 @pytest.fixture
-def ssm_parameters():
+def ssm_parameters(ssm_client):
     """Create mocked SSM parameters."""
-    with mock_aws():
-        ssm = boto3.client("ssm", region_name="eu-west-1")
-        
-        # Create test parameters
-        ssm.put_parameter(
-            Name="/vidscribe/youtube_channels",
-            Value='["UCBcRF18a7Qf58cCRy5xuWwQ"]',
-            Type="String"
-        )
-        
-        ssm.put_parameter(
-            Name="/vidscribe/youtube_api_key",
-            Value="test-youtube-api-key",
-            Type="SecureString"
-        )
-        
-        ssm.put_parameter(
-            Name="/vidscribe/llm_config",
-            Value='{"provider": "gemini", "model": "gemini-flash-latest"}',
-            Type="String"
-        )
-        
-        ssm.put_parameter(
-            Name="/vidscribe/llm_api_key",
-            Value="test-llm-api-key",
-            Type="SecureString"
-        )
-        
-        ssm.put_parameter(
-            Name="/vidscribe/destination_email",
-            Value="test@example.com",
-            Type="String"
-        )
-        
-        ssm.put_parameter(
-            Name="/vidscribe/sender_email",
-            Value="sender@example.com",
-            Type="String"
-        )
-        
-        yield ssm
+    ssm = ssm_client
+    
+    # Create test parameters
+    ssm.put_parameter(
+        Name="/vidscribe/youtube_channels",
+        Value='["UCBcRF18a7Qf58cCRy5xuWwQ"]',
+        Type="String"
+    )
+    
+    ssm.put_parameter(
+        Name="/vidscribe/youtube_api_key",
+        Value="test-youtube-api-key",
+        Type="SecureString"
+    )
+    
+    ssm.put_parameter(
+        Name="/vidscribe/llm_config",
+        Value='{"provider": "gemini", "model": "gemini-flash-latest"}',
+        Type="String"
+    )
+    
+    ssm.put_parameter(
+        Name="/vidscribe/llm_api_key",
+        Value="test-llm-api-key",
+        Type="SecureString"
+    )
+    
+    ssm.put_parameter(
+        Name="/vidscribe/destination_email",
+        Value="test@example.com",
+        Type="String"
+    )
+    
+    ssm.put_parameter(
+        Name="/vidscribe/sender_email",
+        Value="sender@example.com",
+        Type="String"
+    )
+    
+    yield ssm
 
 
 # -----------------------------------------------------------------------------
 # SES Fixtures
 # -----------------------------------------------------------------------------
 
-@pytest.fixture
-def ses_client():
-    """Create a mocked SES client with verified identities."""
-    with mock_aws():
-        ses = boto3.client("ses", region_name="eu-west-1")
-        
-        # Verify email identities
-        ses.verify_email_identity(EmailAddress="sender@example.com")
-        ses.verify_email_identity(EmailAddress="test@example.com")
-        
-        yield ses
+@pytest.fixture(scope="session")
+def ses_client(moto_session):
+    """Return one mocked SES client (identities are verified by moto_session)."""
+    return boto3.client("ses", region_name="eu-west-1")
 
 
 # -----------------------------------------------------------------------------
 # Sample Data Fixtures
 # -----------------------------------------------------------------------------
 
-@pytest.fixture
+# Frozen once per test run: samples stay inside the 7-day newsletter window
+# (so no fixed calendar date) without calling datetime.now() per fixture
+_NOW = datetime.now(timezone.utc)
+_NOW_ISO = _NOW.isoformat()
+_TTL = int(_NOW.timestamp()) + 30 * 24 * 60 * 60
+
+_SAMPLE_VIDEO = {
+    "video_id": "abc123xyz",
+    "title": "Test Video Title",
+    "channel_id": "UCBcRF18a7Qf58cCRy5xuWwQ",
+    "channel_title": "Test Channel",
+    "published_at": _NOW_ISO,
+    "description": "This is a test video description."
+}
+
+# SQS message body as sent by the poller, serialized once per run
+_SAMPLE_SQS_BODY = json.dumps({
+    key: _SAMPLE_VIDEO[key]
+    for key in ("video_id", "title", "channel_id", "channel_title", "published_at")
+}, separators=(",", ":"))
+
+_SAMPLE_EVENTBRIDGE_EVENT = {
+    "version": "0",
+    "id": "12345678-1234-1234-1234-123456789012",
+    "detail-type": "Scheduled Event",
+    "source": "aws.events",
+    "account": "123456789012",
+    "time": _NOW_ISO,
+    "region": "eu-west-1",
+    "resources": [
+        "arn:aws:events:eu-west-1:123456789012:rule/vidscribe-poller-schedule"
+    ],
+    "detail": {}
+}
+
+_SAMPLE_SUMMARY = {
+    "pk": "VIDEO#abc123xyz",
+    "sk": "METADATA",
+    "status": "PROCESSED",
+    "gsi1pk": "SUMMARY",
+    "gsi1sk": _NOW_ISO,
+    "video_id": "abc123xyz",
+    "title": "Test Video Title",
+    "channel_id": "UCBcRF18a7Qf58cCRy5xuWwQ",
+    "channel_title": "Test Channel",
+    "published_at": _NOW_ISO,
+    "summary": "This is a test summary of the video content.",
+    "summarized_at": _NOW_ISO,
+    "ttl": _TTL
+}
+
+
+@pytest.fixture(scope="session")
 def sample_video():
-    """Return a sample video dictionary."""
-    return {
-        "video_id": "abc123xyz",
-        "title": "Test Video Title",
-        "channel_id": "UCBcRF18a7Qf58cCRy5xuWwQ",
-        "channel_title": "Test Channel",
-        "published_at": datetime.now(timezone.utc).isoformat(),
-        "description": "This is a test video description."
-    }
+    """Return a sample video dictionary (shared: copy before mutating)."""
+    return _SAMPLE_VIDEO
 
 
 @pytest.fixture
-def sample_sqs_event(sample_video):
+def sample_sqs_event():
     """Return a sample SQS event for testing."""
     return {
         "Records": [
             {
                 "messageId": "msg-12345",
                 "receiptHandle": "receipt-handle-123",
-                "body": json.dumps({
-                    "video_id": sample_video["video_id"],
-                    "title": sample_video["title"],
-                    "channel_id": sample_video["channel_id"],
-                    "channel_title": sample_video["channel_title"],
-                    "published_at": sample_video["published_at"]
-                }),
+                "body": _SAMPLE_SQS_BODY,
                 "attributes": {
                     "ApproximateReceiveCount": "1"
                 },
@@ -220,66 +364,36 @@ def sample_sqs_event(sample_video):
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_eventbridge_event():
-    """Return a sample EventBridge scheduled event."""
-    return {
-        "version": "0",
-        "id": "12345678-1234-1234-1234-123456789012",
-        "detail-type": "Scheduled Event",
-        "source": "aws.events",
-        "account": "123456789012",
-        "time": datetime.now(timezone.utc).isoformat(),
-        "region": "eu-west-1",
-        "resources": [
-            "arn:aws:events:eu-west-1:123456789012:rule/vidscribe-poller-schedule"
-        ],
-        "detail": {}
-    }
+    """Return a sample EventBridge scheduled event (shared: copy before mutating)."""
+    return _SAMPLE_EVENTBRIDGE_EVENT
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_summary():
-    """Return a sample summary dictionary for DynamoDB."""
-    now = datetime.now(timezone.utc)
-    return {
-        "pk": "SUMMARY#abc123xyz",
-        "sk": "DATA",
-        "gsi1pk": "SUMMARY",
-        "gsi1sk": now.isoformat(),
-        "video_id": "abc123xyz",
-        "title": "Test Video Title",
-        "channel_id": "UCBcRF18a7Qf58cCRy5xuWwQ",
-        "channel_title": "Test Channel",
-        "published_at": now.isoformat(),
-        "summary": "This is a test summary of the video content.",
-        "summarized_at": now.isoformat(),
-        "ttl": int((now.timestamp()) + 30 * 24 * 60 * 60)
-    }
+    """Return a sample processed video record (shared: copy before mutating)."""
+    return _SAMPLE_SUMMARY
 
 
 # -----------------------------------------------------------------------------
 # Lambda Context Mock
 # -----------------------------------------------------------------------------
 
-class MockLambdaContext:
-    """Mock Lambda context object for testing."""
-    
-    def __init__(self):
-        self.function_name = "test-function"
-        self.function_version = "$LATEST"
-        self.invoked_function_arn = "arn:aws:lambda:eu-west-1:123456789012:function:test-function"
-        self.memory_limit_in_mb = 256
-        self.aws_request_id = "test-request-id-12345"
-        self.log_group_name = "/aws/lambda/test-function"
-        self.log_stream_name = "2024/01/15/[$LATEST]abc123"
-        self._remaining_time_ms = 30000
-    
-    def get_remaining_time_in_millis(self):
-        return self._remaining_time_ms
+# Shared across tests: handlers only read from the context
+_LAMBDA_CONTEXT = SimpleNamespace(
+    function_name="test-function",
+    function_version="$LATEST",
+    invoked_function_arn="arn:aws:lambda:eu-west-1:123456789012:function:test-function",
+    memory_limit_in_mb=256,
+    aws_request_id="test-request-id-12345",
+    log_group_name="/aws/lambda/test-function",
+    log_stream_name="2024/01/15/[$LATEST]abc123",
+    get_remaining_time_in_millis=lambda: 30000
+)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def lambda_context():
     """Return a mock Lambda context."""
-    return MockLambdaContext()
+    return _LAMBDA_CONTEXT
@@ -4,20 +4,35 @@ VidScribe - Newsletter Lambda Tests
 Unit tests for the Newsletter Lambda function.
 """
 
-import json
 import pytest
-from unittest.mock import patch, MagicMock
-from moto import mock_aws
+from unittest.mock import patch
 from datetime import datetime, timedelta, timezone
 
+from src.newsletter import handler as newsletter_handler
+from src.newsletter.handler import (
+    EMAIL_TEMPLATE,
+    _EMAIL_PARTS,
+    build_email_content,
+    format_date,
+    format_summary_html,
+    get_weekly_summaries,
+    mark_summaries_sent,
+    render_template_parts,
+    send_email,
+)
+
+
+@pytest.fixture(scope="module")
+def sample_email_output(sample_summary):
+    """Render the (html, plain) email for the sample summary once per module."""
+    return build_email_content([sample_summary])
+
 
 class TestNewsletterLambda:
     """Test cases for the Newsletter Lambda handler."""
     
-    @mock_aws
     def test_get_weekly_summaries_success(self, dynamodb_table, sample_summary):
         """Test retrieving weekly summaries from DynamoDB."""
-        from src.newsletter.handler import get_weekly_summaries
         
         # Add a summary to the table
         dynamodb_table.put_item(Item=sample_summary)
@@ -26,20 +41,19 @@ class TestNewsletterLambda:
         
         assert len(summaries) == 1
         assert summaries[0]["video_id"] == sample_summary["video_id"]
+        # Keys needed by mark_summaries_sent are projected, unused attributes are not
+        assert summaries[0]["pk"] == sample_summary["pk"]
+        assert "ttl" not in summaries[0]
     
-    @mock_aws
     def test_get_weekly_summaries_empty(self, dynamodb_table):
         """Test when there are no summaries."""
-        from src.newsletter.handler import get_weekly_summaries
         
         summaries = get_weekly_summaries(dynamodb_table)
         
         assert summaries == []
     
-    @mock_aws
     def test_get_weekly_summaries_filters_old(self, dynamodb_table):
         """Test that summaries older than 7 days are not included."""
-        from src.newsletter.handler import get_weekly_summaries
         
         # Add an old summary (8 days ago)
         old_date = datetime.now(timezone.utc) - timedelta(days=8)
@@ -59,10 +73,8 @@ class TestNewsletterLambda:
         # Should not include the old summary
         assert len(summaries) == 0
 
-    @mock_aws
     def test_get_weekly_summaries_excludes_already_sent(self, dynamodb_table, sample_summary):
         """Sent summaries must not be included again in future newsletters."""
-        from src.newsletter.handler import get_weekly_summaries
 
         sent_summary = sample_summary.copy()
         sent_summary["newsletter_sent_at"] = datetime.now(timezone.utc).isoformat()
@@ -71,19 +83,17 @@ class TestNewsletterLambda:
         summaries = get_weekly_summaries(dynamodb_table)
         assert summaries == []
 
-    @mock_aws
-    def test_mark_summaries_sent(self, dynamodb_table, sample_summary):
+    def test_mark_summaries_sent(self, dynamodb_table_simple, sample_summary):
         """Mark summaries as sent after successful delivery."""
-        from src.newsletter.handler import mark_summaries_sent
 
-        dynamodb_table.put_item(Item=sample_summary)
+        dynamodb_table_simple.put_item(Item=sample_summary)
 
-        stats = mark_summaries_sent(dynamodb_table, [sample_summary])
+        stats = mark_summaries_sent(dynamodb_table_simple, [sample_summary])
 
         assert stats["marked"] == 1
         assert stats["errors"] == 0
 
-        response = dynamodb_table.get_item(
+        response = dynamodb_table_simple.get_item(
             Key={"pk": sample_summary["pk"], "sk": sample_summary["sk"]}
         )
         item = response["Item"]
@@ -92,7 +102,6 @@ class TestNewsletterLambda:
     
     def test_format_summary_html_single_paragraph(self):
         """Test HTML formatting with a single paragraph."""
-        from src.newsletter.handler import format_summary_html
         
         text = "This is a single paragraph summary."
         result = format_summary_html(text)
@@ -101,7 +110,6 @@ class TestNewsletterLambda:
     
     def test_format_summary_html_multiple_paragraphs(self):
         """Test HTML formatting with multiple paragraphs."""
-        from src.newsletter.handler import format_summary_html
         
         text = "First paragraph.\n\nSecond paragraph.\n\nThird paragraph."
         result = format_summary_html(text)
@@ -112,8 +120,6 @@ class TestNewsletterLambda:
 
     def test_format_summary_html_markdown_fallback(self):
         """Test fallback markdown rendering when python-markdown is unavailable."""
-        import src.newsletter.handler as newsletter_handler
-
         text = (
             "# Title\n\n"
             "- **Key point** with [link](https://example.com)\n"
@@ -136,7 +142,6 @@ class TestNewsletterLambda:
     
     def test_format_date_valid(self):
         """Test date formatting with valid ISO date."""
-        from src.newsletter.handler import format_date
         
         result = format_date("2024-01-15T10:30:00+00:00")
         
@@ -144,7 +149,6 @@ class TestNewsletterLambda:
     
     def test_format_date_with_z_suffix(self):
         """Test date formatting with Z suffix."""
-        from src.newsletter.handler import format_date
         
         result = format_date("2024-01-15T10:30:00Z")
         
@@ -152,17 +156,15 @@ class TestNewsletterLambda:
     
     def test_format_date_invalid(self):
         """Test date formatting with invalid date returns original."""
-        from src.newsletter.handler import format_date
         
         result = format_date("not-a-date")
         
         assert result == "not-a-date"
     
-    def test_build_email_content_with_summaries(self, sample_summary):
+    def test_build_email_content_with_summaries(self, sample_summary, sample_email_output):
         """Test email content building with summaries."""
-        from src.newsletter.handler import build_email_content
         
-        html, plain = build_email_content([sample_summary])
+        html, plain = sample_email_output
         
         # Check HTML content
         assert "VidScribe" in html
@@ -176,17 +178,14 @@ class TestNewsletterLambda:
     
     def test_build_email_content_empty(self):
         """Test email content building with no summaries."""
-        from src.newsletter.handler import build_email_content
         
         html, plain = build_email_content([])
         
         assert "No New Videos This Week" in html
         assert "No new videos" in plain
     
-    @mock_aws
     def test_send_email_success(self, ses_client):
         """Test successful email sending via SES."""
-        from src.newsletter.handler import send_email
         
         result = send_email(
             sender="sender@example.com",
@@ -198,23 +197,10 @@ class TestNewsletterLambda:
         
         assert result is True
     
-    @mock_aws
-    def test_lambda_handler_success(
-        self, dynamodb_table, ssm_parameters, ses_client,
-        sample_summary, sample_eventbridge_event, lambda_context
-    ):
-        """Test the full Newsletter Lambda handler."""
-        # Add a summary to the table
-        dynamodb_table.put_item(Item=sample_summary)
-        
-        # Note: Full integration testing requires mocking at module level
-        # or restructuring for dependency injection
-    
-    def test_email_template_structure(self, sample_summary):
+    def test_email_template_structure(self, sample_email_output):
         """Test that the email template has proper structure."""
-        from src.newsletter.handler import build_email_content
         
-        html, _ = build_email_content([sample_summary])
+        html, _ = sample_email_output
         
         # Check for essential HTML structure
         assert "<!DOCTYPE html>" in html
@@ -230,25 +216,22 @@ class TestNewsletterLambda:
         # Check for responsive design hints
         assert "max-width" in html or "viewport" in html
     
-    def test_email_template_video_links(self, sample_summary):
+    def test_render_template_parts_matches_template_format(self):
+        """The pre-parsed email shell renders exactly like EMAIL_TEMPLATE.format."""
+        values = {"date_range": "Jan 08 - Jan 15, 2024", "content": "<p>{not a field}</p>"}
+
+        assert render_template_parts(_EMAIL_PARTS, values) == EMAIL_TEMPLATE.format(**values)
+    
+    def test_email_template_video_links(self, sample_summary, sample_email_output):
         """Test that video links are correctly formed."""
-        from src.newsletter.handler import build_email_content
         
-        html, plain = build_email_content([sample_summary])
+        html, plain = sample_email_output
         
         expected_link = f"https://youtube.com/watch?v={sample_summary['video_id']}"
         
         assert expected_link in html
         assert expected_link in plain
     
-    @mock_aws
-    def test_lambda_handler_missing_emails(
-        self, dynamodb_table, lambda_context, sample_eventbridge_event
-    ):
-        """Test handler behavior when email addresses are not configured."""
-        # This would test the error handling when SSM parameters are missing
-        pass
-    
     def test_subject_line_with_summaries(self, sample_summary):
         """Test that subject line includes video count."""
         # Subject generation is done in lambda_handler
@@ -5,38 +5,53 @@ Unit tests for the Poller Lambda function using moto for AWS mocking.
 """
 
 import json
-import pytest
+import threading
 from unittest.mock import patch, MagicMock
-from moto import mock_aws
-import boto3
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+from datetime import datetime, timezone
+
+from src.poller.handler import (
+    calculate_ttl,
+    get_ssm_parameter,
+    get_youtube_videos,
+    is_video_processed,
+    lambda_handler,
+    mark_video_queued,
+    poll_channel,
+    send_to_sqs,
+    send_to_sqs_batch,
+)
 
 
 class TestPollerLambda:
     """Test cases for the Poller Lambda handler."""
     
-    @mock_aws
     def test_get_ssm_parameter_success(self, ssm_parameters):
         """Test SSM parameter retrieval."""
-        # Import after mocking
-        from src.poller.handler import get_ssm_parameter
-        
         result = get_ssm_parameter("/vidscribe/youtube_channels")
         assert result == '["UCBcRF18a7Qf58cCRy5xuWwQ"]'
     
-    @mock_aws
     def test_get_ssm_parameter_with_decryption(self, ssm_parameters):
         """Test SSM SecureString parameter retrieval with decryption."""
-        from src.poller.handler import get_ssm_parameter
-        
         result = get_ssm_parameter("/vidscribe/youtube_api_key", with_decryption=True)
         assert result == "test-youtube-api-key"
     
-    @mock_aws
+    def test_get_ssm_parameter_cached_across_calls(self):
+        """Warm invocations reuse SSM values until the cache TTL expires."""
+        mock_ssm = MagicMock()
+        mock_ssm.get_parameter.return_value = {"Parameter": {"Value": "cached-value"}}
+
+        with patch("src.poller.handler.ssm_client", mock_ssm):
+            assert get_ssm_parameter("/vidscribe/youtube_channels") == "cached-value"
+            assert get_ssm_parameter("/vidscribe/youtube_channels") == "cached-value"
+            assert mock_ssm.get_parameter.call_count == 1
+
+            with patch("src.poller.handler.SSM_CACHE_TTL_SECONDS", 0):
+                get_ssm_parameter("/vidscribe/youtube_channels")
+            assert mock_ssm.get_parameter.call_count == 2
+    
     def test_calculate_ttl(self):
         """Test TTL calculation."""
-        from src.poller.handler import calculate_ttl
-        from datetime import datetime, timezone
-        
         ttl = calculate_ttl()
         now = int(datetime.now(timezone.utc).timestamp())
         
@@ -46,102 +61,183 @@ class TestPollerLambda:
         
         assert expected_min <= ttl <= expected_max
     
-    @mock_aws
-    def test_is_video_processed_not_found(self, dynamodb_table):
+    def test_is_video_processed_not_found(self, dynamodb_table_simple):
         """Test checking for a video that doesn't exist in DynamoDB."""
-        from src.poller.handler import is_video_processed
-        
-        result = is_video_processed(dynamodb_table, "nonexistent-video-id")
+        result = is_video_processed(dynamodb_table_simple, "nonexistent-video-id")
         assert result is False
     
-    @mock_aws
-    def test_is_video_processed_found(self, dynamodb_table):
+    def test_is_video_processed_found(self, dynamodb_table_simple):
         """Test checking for a video that exists in DynamoDB."""
-        from src.poller.handler import is_video_processed
-        
         # Add a video to the table
-        dynamodb_table.put_item(Item={
+        dynamodb_table_simple.put_item(Item={
             "pk": "VIDEO#existing-video-id",
             "sk": "METADATA",
             "status": "QUEUED"
         })
         
-        result = is_video_processed(dynamodb_table, "existing-video-id")
+        result = is_video_processed(dynamodb_table_simple, "existing-video-id")
         assert result is True
     
-    @mock_aws
-    def test_mark_video_queued_success(self, dynamodb_table, sample_video):
+    def test_mark_video_queued_success(self, dynamodb_table_simple, sample_video):
         """Test marking a new video as queued."""
-        from src.poller.handler import mark_video_queued
-        
-        result = mark_video_queued(dynamodb_table, sample_video)
+        result = mark_video_queued(dynamodb_table_simple, sample_video)
         assert result is True
         
         # Verify the item was created
-        response = dynamodb_table.get_item(Key={
+        response = dynamodb_table_simple.get_item(Key={
             "pk": f"VIDEO#{sample_video['video_id']}",
             "sk": "METADATA"
         })
         assert "Item" in response
         assert response["Item"]["status"] == "QUEUED"
     
-    @mock_aws
-    def test_mark_video_queued_duplicate(self, dynamodb_table, sample_video):
+    def test_mark_video_queued_duplicate(self, dynamodb_table_simple, sample_video):
         """Test that duplicate videos are not queued."""
-        from src.poller.handler import mark_video_queued
-        
         # Queue the video once
-        result1 = mark_video_queued(dynamodb_table, sample_video)
+        result1 = mark_video_queued(dynamodb_table_simple, sample_video)
         assert result1 is True
         
         # Try to queue again - should return False
-        result2 = mark_video_queued(dynamodb_table, sample_video)
+        result2 = mark_video_queued(dynamodb_table_simple, sample_video)
         assert result2 is False
     
-    @mock_aws
+    def test_mark_video_queued_writes_through_thread_safe_client(self, sample_video):
+        """Channel workers write via the shared client, never the (non thread-safe) resource."""
+        table = MagicMock()
+        table.name = "vidscribe-test-videos"
+
+        assert mark_video_queued(table, sample_video) is True
+
+        table.put_item.assert_not_called()
+        assert table.meta.client.put_item.call_args.kwargs["TableName"] == "vidscribe-test-videos"
+    
+    @patch("src.poller.handler.get_youtube_videos")
+    def test_poll_channel_marks_only_new_videos(self, mock_get_videos, dynamodb_table_simple, sample_video):
+        """Known videos are skipped; new ones are marked QUEUED and returned for SQS."""
+        known = dict(sample_video, video_id="known123")
+        mark_video_queued(dynamodb_table_simple, known)
+        mock_get_videos.return_value = [known, sample_video]
+
+        result = poll_channel(
+            dynamodb_table_simple, sample_video["channel_id"], "key",
+            "2024-01-15T00:00:00Z", datetime.now(timezone.utc)
+        )
+
+        assert result["videos_found"] == 2
+        assert result["videos_skipped"] == 1
+        assert result["errors"] == 0
+        assert result["new_videos"] == [sample_video]
+    
     def test_send_to_sqs_success(self, sqs_queue, sample_video):
         """Test sending a video to SQS."""
-        from src.poller.handler import send_to_sqs
-        
         sqs_client, queue_url = sqs_queue
         
         result = send_to_sqs(sample_video)
         assert result is True
         
         # Verify message was sent
-        messages = sqs_client.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=1)
+        messages = sqs_client.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=1, WaitTimeSeconds=0)
         assert "Messages" in messages
         assert len(messages["Messages"]) == 1
         
         body = json.loads(messages["Messages"][0]["Body"])
         assert body["video_id"] == sample_video["video_id"]
     
-    @mock_aws
+    def test_send_to_sqs_batch_chunks_and_reports_failures(self, sample_video):
+        """Videos go out 10 per request; entries SQS rejects are not reported as sent."""
+        videos = [dict(sample_video, video_id=f"vid{i}") for i in range(12)]
+        mock_sqs = MagicMock()
+        mock_sqs.send_message_batch.side_effect = [
+            {"Successful": [], "Failed": [{"Id": "3", "Code": "InternalError", "Message": "boom"}]},
+            {"Successful": [], "Failed": []},
+        ]
+
+        with patch("src.poller.handler.sqs_client", mock_sqs):
+            sent = send_to_sqs_batch(videos)
+
+        assert mock_sqs.send_message_batch.call_count == 2
+        assert len(mock_sqs.send_message_batch.call_args_list[0].kwargs["Entries"]) == 10
+        assert [video["video_id"] for video in sent] == [f"vid{i}" for i in range(12) if i != 3]
+    
     @patch("src.poller.handler.get_youtube_videos")
     def test_lambda_handler_success(
-        self, mock_get_videos, dynamodb_table, sqs_queue, ssm_parameters,
+        self, mock_get_videos, dynamodb_table_simple, sqs_queue, ssm_client, ssm_parameters,
         sample_video, sample_eventbridge_event, lambda_context
     ):
-        """Test the full Lambda handler execution."""
-        # Mock YouTube API response
-        mock_get_videos.return_value = [sample_video]
-        
-        from src.poller.handler import lambda_handler
-        
-        # Note: We need to reinitialize clients inside the mock context
-        # This is a limitation of moto with module-level clients
-        
-        # For a full integration test, you would need to restructure
-        # the handler to accept clients as parameters or use dependency injection
+        """Videos from every channel are marked QUEUED, sent to SQS and counted once."""
+        sqs_client, queue_url = sqs_queue
+        ssm_client.put_parameter(
+            Name="/vidscribe/youtube_channels", Value='["UCone", "UCtwo"]', Type="String", Overwrite=True
+        )
+        # UCone has one new and one already known video, UCtwo one new video
+        known = dict(sample_video, video_id="known1", channel_id="UCone")
+        mark_video_queued(dynamodb_table_simple, known)
+        channel_videos = {
+            "UCone": [dict(sample_video, video_id="one1", channel_id="UCone"), known],
+            "UCtwo": [dict(sample_video, video_id="two1", channel_id="UCtwo")],
+        }
+        mock_get_videos.side_effect = lambda channel_id, api_key, published_after: channel_videos[channel_id]
+
+        result = lambda_handler(sample_eventbridge_event, lambda_context)
+
+        assert result["statusCode"] == 200
+        stats = json.loads(result["body"])["stats"]
+        assert stats == {
+            "channels_checked": 2,
+            "videos_found": 3,
+            "videos_queued": 2,
+            "videos_skipped": 1,
+            "errors": 0,
+            "retries_requeued": 0
+        }
+
+        messages = sqs_client.receive_message(
+            QueueUrl=queue_url, MaxNumberOfMessages=10, WaitTimeSeconds=0
+        )["Messages"]
+        assert sorted(json.loads(m["Body"])["video_id"] for m in messages) == ["one1", "two1"]
+
+        for video_id in ("one1", "two1"):
+            item = dynamodb_table_simple.get_item(Key={"pk": f"VIDEO#{video_id}", "sk": "METADATA"})["Item"]
+            assert item["status"] == "QUEUED"
     
-    @patch("urllib.request.urlopen")
-    def test_get_youtube_videos_success(self, mock_urlopen):
+    def test_lambda_handler_sends_each_channel_without_waiting_for_the_others(
+        self, dynamodb_table_simple, sqs_queue, ssm_client, ssm_parameters,
+        sample_video, sample_eventbridge_event, lambda_context
+    ):
+        """A finished channel's videos reach SQS while slower channels are still polling."""
+        ssm_client.put_parameter(
+            Name="/vidscribe/youtube_channels", Value='["UCfast", "UCslow"]', Type="String", Overwrite=True
+        )
+        fast_video = dict(sample_video, video_id="fast1", channel_id="UCfast")
+        slow_video = dict(sample_video, video_id="slow1", channel_id="UCslow")
+        fast_sent = threading.Event()
+
+        def fake_videos(channel_id, api_key, published_after):
+            if channel_id == "UCfast":
+                return [fast_video]
+            # The slow channel only finishes once the fast one is in SQS
+            assert fast_sent.wait(timeout=5), "fast channel was not sent before the slow one finished"
+            return [slow_video]
+
+        def track_send(videos):
+            sent = send_to_sqs_batch(videos)
+            if fast_video in sent:
+                fast_sent.set()
+            return sent
+
+        with patch("src.poller.handler.get_youtube_videos", side_effect=fake_videos), \
+                patch("src.poller.handler.send_to_sqs_batch", side_effect=track_send):
+            result = lambda_handler(sample_eventbridge_event, lambda_context)
+
+        stats = json.loads(result["body"])["stats"]
+        assert stats["errors"] == 0
+        assert stats["videos_queued"] == 2
+
+    @patch("src.poller.handler.HTTP")
+    def test_get_youtube_videos_success(self, mock_http):
         """Test YouTube API video fetching."""
-        from src.poller.handler import get_youtube_videos
-        
         # Mock response
-        mock_response = MagicMock()
-        mock_response.read.return_value = json.dumps({
+        mock_http.request.return_value = MagicMock(status=200, data=json.dumps({
             "items": [
                 {
                     "id": {"videoId": "test123"},
@@ -153,10 +249,7 @@ class TestPollerLambda:
                     }
                 }
             ]
-        }).encode("utf-8")
-        mock_response.__enter__ = MagicMock(return_value=mock_response)
-        mock_response.__exit__ = MagicMock(return_value=False)
-        mock_urlopen.return_value = mock_response
+        }).encode("utf-8"))
         
         videos = get_youtube_videos(
             channel_id="UCtest123",
@@ -168,20 +261,11 @@ class TestPollerLambda:
         assert videos[0]["video_id"] == "test123"
         assert videos[0]["title"] == "Test Video"
     
-    @patch("urllib.request.urlopen")
-    def test_get_youtube_videos_api_error(self, mock_urlopen):
+    @patch("src.poller.handler.HTTP")
+    def test_get_youtube_videos_api_error(self, mock_http):
         """Test YouTube API error handling."""
-        from src.poller.handler import get_youtube_videos
-        import urllib.error
-        
         # Simulate API error
-        mock_urlopen.side_effect = urllib.error.HTTPError(
-            url="https://youtube.googleapis.com/youtube/v3/search",
-            code=403,
-            msg="Forbidden",
-            hdrs={},
-            fp=None
-        )
+        mock_http.request.return_value = MagicMock(status=403, reason="Forbidden", data=b"quota")
         
         videos = get_youtube_videos(
             channel_id="UCtest123",
@@ -190,3 +274,19 @@ class TestPollerLambda:
         )
         
         assert videos == []
+
+    @patch("src.poller.handler.HTTP")
+    def test_get_youtube_videos_connection_error_redacts_api_key(self, mock_http, caplog):
+        """Connection errors are logged without the request URL (and its key= parameter)."""
+        url = "https://www.googleapis.com/youtube/v3/search?key=secret-key"
+        mock_http.request.side_effect = MaxRetryError(None, url, NewConnectionError(None, "Failed to establish"))
+
+        videos = get_youtube_videos(
+            channel_id="UCtest123",
+            api_key="secret-key",
+            published_after="2024-01-15T00:00:00Z"
+        )
+
+        assert videos == []
+        assert "MaxRetryError: NewConnectionError" in caplog.text
+        assert "secret-key" not in caplog.text
@@ -5,31 +5,24 @@ Tests for NO_TRANSCRIPT retry logic in processor and poller.
 """
 
 import json
-import boto3
-from moto import mock_aws
 from datetime import datetime, timezone, timedelta
 from unittest.mock import patch
 
-from tests.conftest import MockLambdaContext
+from botocore.exceptions import ClientError
+
+from src.poller.handler import requeue_retryable_videos
+from src.processor.handler import (
+    MAX_TRANSCRIPT_RETRIES,
+    mark_video_failed,
+)
 
 
 class TestRetryLogic:
     """Tests for the retry mechanism."""
 
-    @mock_aws
-    def test_mark_video_failed_no_transcript_first_attempt(self):
+    def test_mark_video_failed_no_transcript_first_attempt(self, dynamodb_table_simple):
         """Test first failure for NO_TRANSCRIPT sets up retry."""
-        # Setup DynamoDB
-        dynamodb = boto3.resource("dynamodb", region_name="eu-west-1")
-        table = dynamodb.create_table(
-            TableName="vidscribe-test-videos",
-            KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"}, {"AttributeName": "sk", "KeyType": "RANGE"}],
-            AttributeDefinitions=[{"AttributeName": "pk", "AttributeType": "S"}, {"AttributeName": "sk", "AttributeType": "S"}],
-            ProvisionedThroughput={"ReadCapacityUnits": 5, "WriteCapacityUnits": 5}
-        )
-        
-        # Import
-        from src.processor.handler import mark_video_failed, RETRY_SCHEDULE_DAYS
+        table = dynamodb_table_simple
 
         # Initial state: QUEUED
         video_id = "test_vid_1"
@@ -53,33 +46,25 @@ class TestRetryLogic:
         
         # Check first_failed_at is recent
         first_failed = datetime.fromisoformat(item["first_failed_at"])
-        assert abs((first_failed - now_utc).total_seconds()) < 10
+        assert abs(first_failed.timestamp() - now_utc.timestamp()) < 10
 
         # Check next_retry_at is scheduled correctly (Day 1 retry = +1 day from failed_at)
         # RETRY_SCHEDULE_DAYS = [1, 3, 5]
-        # retry_count was 0, now became 1. Scheduling for attempt 1 (index 0 in array)
+        # retry_count was absent, now became 1. Scheduling for attempt 1 (index 0 in array)
         # Logic in handler:
-        #   current_retry_count = item.get('retry_count', 0)
-        #   new_retry_count = current_retry_count + 1
+        #   update_item "ADD retry_count :one ... REMOVE next_retry_at",
+        #   ReturnValues="UPDATED_NEW" -> new_retry_count = 1
         #   days_wait = RETRY_SCHEDULE_DAYS[new_retry_count - 1] -> index 0 -> 1 day
+        #   update_item "SET next_retry_at = :next_retry"
         next_retry = datetime.fromisoformat(item["next_retry_at"])
         wait_seconds = (next_retry - first_failed).total_seconds()
         
         # Expect ~1 day (86400 seconds)
         assert 86300 < wait_seconds < 86500
 
-    @mock_aws
-    def test_mark_video_failed_retry_exhausted(self):
+    def test_mark_video_failed_retry_exhausted(self, dynamodb_table_simple):
         """Test final failure marks as PERMANENTLY_FAILED."""
-        dynamodb = boto3.resource("dynamodb", region_name="eu-west-1")
-        table = dynamodb.create_table(
-            TableName="vidscribe-test-videos",
-            KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"}, {"AttributeName": "sk", "KeyType": "RANGE"}],
-            AttributeDefinitions=[{"AttributeName": "pk", "AttributeType": "S"}, {"AttributeName": "sk", "AttributeType": "S"}],
-            ProvisionedThroughput={"ReadCapacityUnits": 5, "WriteCapacityUnits": 5}
-        )
-        
-        from src.processor.handler import mark_video_failed, MAX_TRANSCRIPT_RETRIES
+        table = dynamodb_table_simple
 
         video_id = "test_vid_max"
         
@@ -99,67 +84,100 @@ class TestRetryLogic:
         item = table.get_item(Key={"pk": f"VIDEO#{video_id}", "sk": "METADATA"})["Item"]
         assert item["status"] == "PERMANENTLY_FAILED"
         assert item["failure_reason"] == "NO_TRANSCRIPT_EXHAUSTED"
+        assert item["retry_count"] == MAX_TRANSCRIPT_RETRIES + 1
+        assert item["first_failed_at"] == "2026-01-01T00:00:00+00:00"
 
-    @mock_aws
-    def test_requeue_retryable_videos(self):
-        """Test poller requeues eligible videos."""
-        dynamodb = boto3.resource("dynamodb", region_name="eu-west-1")
-        sqs = boto3.resource("sqs", region_name="eu-west-1")
-        
-        table = dynamodb.create_table(
-            TableName="vidscribe-test-videos",
-            KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"}, {"AttributeName": "sk", "KeyType": "RANGE"}],
-            AttributeDefinitions=[{"AttributeName": "pk", "AttributeType": "S"}, {"AttributeName": "sk", "AttributeType": "S"}],
-            ProvisionedThroughput={"ReadCapacityUnits": 5, "WriteCapacityUnits": 5}
-        )
-        queue = sqs.create_queue(QueueName="vidscribe-test-video-queue")
-        
-        from src.poller.handler import requeue_retryable_videos
+    def test_mark_video_failed_interrupted_is_not_requeued(self, dynamodb_table_simple):
+        """A failed scheduling update must not leave the video eligible for immediate requeue."""
+        table = dynamodb_table_simple
 
-        # 1. Eligible video (retry time passed)
-        past_time = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+        video_id = "test_vid_interrupted"
+        past_retry = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
         table.put_item(Item={
-            "pk": "VIDEO#retry_ready",
+            "pk": f"VIDEO#{video_id}",
             "sk": "METADATA",
-            "video_id": "retry_ready",
-            "status": "FAILED",
+            "video_id": video_id,
+            "status": "QUEUED",
             "failure_reason": "NO_TRANSCRIPT",
-            "next_retry_at": past_time,
-            "retry_count": 1
+            "retry_count": 1,
+            "next_retry_at": past_retry
         })
 
-        # 2. Not eligible (retry time in future)
-        future_time = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
-        table.put_item(Item={
-            "pk": "VIDEO#retry_future",
-            "sk": "METADATA",
-            "video_id": "retry_future",
-            "status": "FAILED",
-            "failure_reason": "NO_TRANSCRIPT",
-            "next_retry_at": future_time,
-            "retry_count": 1
-        })
-        
-        # 3. Not eligible (wrong reason)
-        table.put_item(Item={
-            "pk": "VIDEO#other_fail",
-            "sk": "METADATA",
-            "video_id": "other_fail",
-            "status": "FAILED",
-            "failure_reason": "API_ERROR",
-            "next_retry_at": past_time 
-        })
+        # Let the counter update through, fail the follow-up scheduling update
+        client = table.meta.client
+        update_item = client.update_item
+        calls = []
+
+        def flaky_update_item(**kwargs):
+            calls.append(kwargs)
+            if len(calls) > 1:
+                raise ClientError({"Error": {"Code": "InternalServerError", "Message": "boom"}}, "UpdateItem")
+            return update_item(**kwargs)
+
+        with patch.object(client, "update_item", side_effect=flaky_update_item):
+            mark_video_failed(table, video_id, "No transcript available", failure_reason="NO_TRANSCRIPT")
 
-        # Patch the global SQS_QUEUE_URL in the handler to match our moto queue
-        with patch("src.poller.handler.SQS_QUEUE_URL", queue.url):
-             stats = requeue_retryable_videos(table)
+        assert len(calls) == 2
+        item = table.get_item(Key={"pk": f"VIDEO#{video_id}", "sk": "METADATA"})["Item"]
+        assert item["retry_count"] == 2
+        assert "next_retry_at" not in item
+        assert requeue_retryable_videos(table)["scanned"] == 0
+
+    def test_requeue_retryable_videos(self, dynamodb_table_simple, sqs_queue):
+        """Test poller requeues eligible videos."""
+        table = dynamodb_table_simple
+        sqs_client, queue_url = sqs_queue
+
+        now = datetime.now(timezone.utc)
+        past_time = (now - timedelta(hours=1)).isoformat()
+        future_time = (now + timedelta(hours=1)).isoformat()
+        with table.batch_writer() as batch:
+            # 1. Eligible video (retry time passed)
+            batch.put_item(Item={
+                "pk": "VIDEO#retry_ready",
+                "sk": "METADATA",
+                "video_id": "retry_ready",
+                "status": "FAILED",
+                "failure_reason": "NO_TRANSCRIPT",
+                "next_retry_at": past_time,
+                "retry_count": 1
+            })
+
+            # 2. Not eligible (retry time in future)
+            batch.put_item(Item={
+                "pk": "VIDEO#retry_future",
+                "sk": "METADATA",
+                "video_id": "retry_future",
+                "status": "FAILED",
+                "failure_reason": "NO_TRANSCRIPT",
+                "next_retry_at": future_time,
+                "retry_count": 1
+            })
+
+            # 3. Not eligible (wrong reason)
+            batch.put_item(Item={
+                "pk": "VIDEO#other_fail",
+                "sk": "METADATA",
+                "video_id": "other_fail",
+                "status": "FAILED",
+                "failure_reason": "API_ERROR",
+                "next_retry_at": past_time
+            })
+
+        # sqs_queue points the handler's SQS_QUEUE_URL at the moto queue
+        stats = requeue_retryable_videos(table)
 
         assert stats["requeued"] == 1
         
         # Verify message in SQS
-        messages = queue.receive_messages()
-        assert len(messages) == 1
-        body = json.loads(messages[0].body)
+        attributes = sqs_client.get_queue_attributes(
+            QueueUrl=queue_url, AttributeNames=["ApproximateNumberOfMessages"]
+        )["Attributes"]
+        assert attributes["ApproximateNumberOfMessages"] == "1"
+        messages = sqs_client.receive_message(
+            QueueUrl=queue_url, MaxNumberOfMessages=1, WaitTimeSeconds=0
+        )["Messages"]
+        body = json.loads(messages[0]["Body"])
         assert body["video_id"] == "retry_ready"
         
         # Verify status update in DynamoDB